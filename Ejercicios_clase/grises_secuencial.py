@@ -1,43 +1,34 @@
+import argparse
 import random
 import math
-import itertools
+import os
+import threading
 import time
 import numpy as np
 import matplotlib.pyplot as plt
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from multiprocessing import cpu_count
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Pool, Value, cpu_count, shared_memory
+
+from tsp_comun.enumeracion import generar_rutas_por_bloques
+from tsp_comun.instances import (
+    cached_matrix, cached_result, cities_from_points, load_instance, points_from_cities, store_result,
+)
+from tsp_comun.recorrido_dfs import generar_prefijos, recorrer_dfs
 
 
 # === Funciones de utilidad ===
-def generar_ciudades(n_ciudades, rango=100):
-    """Genera coordenadas aleatorias para las ciudades."""
-    return [(random.randint(0, rango), random.randint(0, rango)) for _ in range(n_ciudades)]
+def generar_ciudades(n_ciudades, rango=100, semilla=None):
+    """Genera coordenadas aleatorias para las ciudades (reproducibles con `semilla`)."""
+    rng = random.Random(semilla)
+    return [(rng.randint(0, rango), rng.randint(0, rango)) for _ in range(n_ciudades)]
 
 
 def calcular_matriz_distancias(ciudades):
-    """Crea una matriz con las distancias euclidianas entre todas las ciudades."""
-    n = len(ciudades)
-    matriz = np.zeros((n, n))
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                x1, y1 = ciudades[i]
-                x2, y2 = ciudades[j]
-                matriz[i][j] = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-    return matriz
-
-
-def generar_rutas(ciudades):
-    """Genera todas las rutas posibles empezando desde la ciudad 0."""
-    n = len(ciudades)
-    indices = list(range(n))
-    ciudad_inicial = indices[0]
-    otras_ciudades = indices[1:]
-    rutas = []
-    for perm in itertools.permutations(otras_ciudades):
-        ruta = [ciudad_inicial] + list(perm) + [ciudad_inicial]
-        rutas.append(ruta)
-    return rutas
+    """Crea una matriz con las distancias euclidianas entre todas las ciudades (broadcasting, sin bucles)."""
+    coords = np.asarray(ciudades, dtype=np.float64).reshape(-1, 2)
+    dx = np.subtract.outer(coords[:, 0], coords[:, 0])
+    dy = np.subtract.outer(coords[:, 1], coords[:, 1])
+    return np.hypot(dx, dy, out=dx)
 
 
 def calcular_distancia_total(ruta, matriz):
@@ -48,17 +39,38 @@ def calcular_distancia_total(ruta, matriz):
     return distancia
 
 
+def vecino_mas_cercano(matriz):
+    """Ruta cerrada desde la ciudad 0 eligiendo siempre la ciudad no visitada más cercana."""
+    n = len(matriz)
+    ruta = [0]
+    visitada = [False] * n
+    visitada[0] = True
+    for _ in range(n - 1):
+        actual = ruta[-1]
+        siguiente = min((j for j in range(n) if not visitada[j]), key=lambda j: matriz[actual][j])
+        visitada[siguiente] = True
+        ruta.append(siguiente)
+    return ruta + [0]
+
+
+def distancias_bloque(bloque, matriz):
+    """Calcula la distancia de las k rutas de un bloque (k x n+1) con indexación NumPy."""
+    return matriz[bloque[:, :-1], bloque[:, 1:]].sum(axis=1)
+
+
 # === SECUENCIAL ===
-def viajero_secuencial(matriz, rutas):
+def viajero_secuencial(matriz, bloques):
+    """Línea base: recorre los bloques ruta por ruta, sin vectorizar (como en el Taller 1)."""
     inicio = time.perf_counter()
     mejor_ruta = None
     menor_distancia = float('inf')
 
-    for ruta in rutas:
-        distancia = calcular_distancia_total(ruta, matriz)
-        if distancia < menor_distancia:
-            menor_distancia = distancia
-            mejor_ruta = ruta
+    for bloque in bloques:
+        for ruta in bloque.tolist():
+            distancia = calcular_distancia_total(ruta, matriz)
+            if distancia < menor_distancia:
+                menor_distancia = distancia
+                mejor_ruta = ruta
 
     fin = time.perf_counter()
     tiempo = fin - inicio
@@ -73,41 +85,325 @@ def viajero_secuencial(matriz, rutas):
 
 # === PARALELO CON ProcessPoolExecutor ===
 def procesar_rutas(sub_rutas, matriz):
-    """Función auxiliar que busca la mejor ruta dentro de un subconjunto."""
-    mejor = None
-    menor = float('inf')
-    for ruta in sub_rutas:
-        d = calcular_distancia_total(ruta, matriz)
-        if d < menor:
-            menor = d
-            mejor = ruta
+    """Función auxiliar que busca la mejor ruta dentro de un bloque (k x n+1) de rutas."""
+    distancias = distancias_bloque(sub_rutas, matriz)
+    i = int(np.argmin(distancias))
+    return sub_rutas[i].tolist(), float(distancias[i])
+
+
+def procesar_rutas_con_cota(sub_rutas, matriz, incumbente):
+    """
+    Como procesar_rutas, pero suma las aristas columna a columna y descarta
+    cada ruta en cuanto su costo parcial alcanza la mejor distancia global
+    (`incumbente`, un multiprocessing.Value compartido por todos los
+    procesos). Si el bloque mejora la cota, la actualiza de forma atómica.
+
+    Devuelve (mejor_ruta, distancia, aristas evaluadas); mejor_ruta es None
+    si todas las rutas del bloque se descartaron.
+    """
+    rutas = sub_rutas
+    parcial = np.zeros(len(rutas))
+    evaluadas = 0
+    for j in range(sub_rutas.shape[1] - 1):
+        parcial += matriz[rutas[:, j], rutas[:, j + 1]]
+        evaluadas += len(rutas)
+        vivas = parcial < incumbente.value
+        if not vivas.all():
+            rutas, parcial = rutas[vivas], parcial[vivas]
+            if len(rutas) == 0:
+                return None, float('inf'), evaluadas
+
+    i = int(np.argmin(parcial))
+    distancia = float(parcial[i])
+    with incumbente.get_lock():
+        if distancia < incumbente.value:
+            incumbente.value = distancia
+    return rutas[i].tolist(), distancia, evaluadas
+
+
+# Matriz compartida de cada proceso (asignada por adjuntar_matriz)
+_compartido = {}
+
+
+def adjuntar_matriz(shm_name, shape, dtype, incumbente=None):
+    """
+    Inicializador de cada proceso: se adjunta a la matriz en memoria compartida
+    sin copiarla y guarda la cota global compartida, si se entrega.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _compartido["shm"] = shm  # mantener la referencia mientras viva el proceso
+    _compartido["matriz"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _compartido["incumbente"] = incumbente
+
+
+def filas_compartidas():
+    """
+    Matriz como listas de listas para el recorrido en profundidad, creada la
+    primera vez que un proceso la pide. Es una copia por proceso (n*n
+    flotantes, despreciable para los n que admite la búsqueda exacta) que se
+    acepta a propósito: la indexación escalar matriz[i][j] sobre listas es
+    ~1.7x más rápida que sobre el ndarray compartido. Los procesos que
+    evalúan bloques vectorizados usan el ndarray y no pagan la copia.
+    """
+    if "filas" not in _compartido:
+        _compartido["filas"] = _compartido["matriz"].tolist()
+    return _compartido["filas"]
+
+
+def procesar_rutas_compartidas(sub_rutas):
+    """Igual que procesar_rutas_con_cota, pero leyendo la matriz y la cota desde memoria compartida."""
+    return procesar_rutas_con_cota(sub_rutas, _compartido["matriz"], _compartido["incumbente"])
+
+
+def viajero_paralelo(matriz, bloques, n_processes):
+    inicio = time.perf_counter()
+
+    # El vecino más cercano da una cota inicial para poder cortar desde el primer bloque
+    mejor_global = vecino_mas_cercano(matriz)
+    menor_global = calcular_distancia_total(mejor_global, matriz)
+    aristas_evaluadas = 0
+    aristas_totales = 0
+
+    # La matriz se publica una vez en memoria compartida: cada futuro solo
+    # serializa su bloque de rutas
+    shm = shared_memory.SharedMemory(create=True, size=matriz.nbytes)
+    matriz_compartida = np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=shm.buf)
+    np.copyto(matriz_compartida, matriz)
+    # Mejor distancia conocida por cualquier proceso: permite cortar rutas a medio sumar
+    incumbente = Value('d', menor_global)
+
+    def acumular(future):
+        nonlocal mejor_global, menor_global, aristas_evaluadas
+        mejor_local, menor_local, evaluadas = future.result()
+        aristas_evaluadas += evaluadas
+        if menor_local < menor_global:
+            menor_global = menor_local
+            mejor_global = mejor_local
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=n_processes,
+            initializer=adjuntar_matriz,
+            initargs=(shm.name, matriz.shape, matriz.dtype, incumbente),
+        ) as executor:
+            # Como máximo 2 bloques por proceso en vuelo: los bloques se generan
+            # a medida que se liberan, sin tener nunca todas las rutas en memoria
+            pendientes = set()
+            for bloque in bloques:
+                if len(pendientes) >= 2 * n_processes:
+                    terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                    for future in terminados:
+                        acumular(future)
+                aristas_totales += bloque.shape[0] * (bloque.shape[1] - 1)
+                pendientes.add(executor.submit(procesar_rutas_compartidas, bloque))
+
+            for future in pendientes:
+                acumular(future)
+    finally:
+        del matriz_compartida
+        shm.close()
+        shm.unlink()
+
+    fin = time.perf_counter()
+    tiempo = fin - inicio
+    omitidas = 1 - aristas_evaluadas / aristas_totales if aristas_totales else 0.0
+
+    print("\n⚙️ [Paralelo - ProcessPoolExecutor]")
+    print("Mejor ruta:", mejor_global)
+    print("Distancia mínima:", round(menor_global, 2))
+    print(f"Aristas evaluadas: {aristas_evaluadas} de {aristas_totales} ({100 * omitidas:.1f}% omitidas por la cota)")
+    print(f"Tiempo de ejecución: {tiempo:.6f} segundos")
+
+    return mejor_global, menor_global, tiempo
+
+
+# === PARALELO EN PROFUNDIDAD (costo incremental) ===
+def procesar_prefijo(prefijo):
+    """Función auxiliar: mejor ruta entre las que empiezan por [0, *prefijo] (para usar con el Pool)."""
+    mejor, menor, _ = recorrer_dfs(filas_compartidas(), prefijo)
     return mejor, menor
 
 
-def viajero_paralelo(matriz, rutas, n_processes):
+def viajero_paralelo_dfs(matriz, n_processes):
     inicio = time.perf_counter()
 
-    # Dividir rutas en partes para cada proceso
-    chunk_size = len(rutas) // n_processes
-    subsets = [rutas[i:i + chunk_size] for i in range(0, len(rutas), chunk_size)]
-
     mejor_global = None
     menor_global = float('inf')
+    prefijos = generar_prefijos(len(matriz), 4 * n_processes)
+
+    shm = shared_memory.SharedMemory(create=True, size=matriz.nbytes)
+    matriz_compartida = np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=shm.buf)
+    np.copyto(matriz_compartida, matriz)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=n_processes,
+            initializer=adjuntar_matriz,
+            initargs=(shm.name, matriz.shape, matriz.dtype),
+        ) as executor:
+            for mejor_local, menor_local in executor.map(procesar_prefijo, prefijos):
+                if menor_local < menor_global:
+                    menor_global = menor_local
+                    mejor_global = mejor_local
+    finally:
+        del matriz_compartida
+        shm.close()
+        shm.unlink()
+
+    fin = time.perf_counter()
+    tiempo = fin - inicio
+
+    print("\n🌲 [Paralelo - DFS por prefijos]")
+    print("Mejor ruta:", mejor_global)
+    print("Distancia mínima:", round(menor_global, 2))
+    print(f"Tiempo de ejecución: {tiempo:.6f} segundos")
+
+    return mejor_global, menor_global, tiempo
+
+
+# === PARALELO DINÁMICO (planificador adaptativo) ===
+# Prefijos generados por proceso: muchas tareas pequeñas equilibran subárboles desiguales
+TAREAS_POR_PROCESO = 32
+# Duración buscada para cada lote de prefijos: mayor reparte peor, menor paga más comunicación
+LATENCIA_OBJETIVO = 0.05
+# Peso de la última medición en el promedio móvil de segundos por prefijo
+SUAVIZADO = 0.3
 
-    with ProcessPoolExecutor(max_workers=n_processes) as executor:
-        futures = [executor.submit(procesar_rutas, subset, matriz) for subset in subsets]
-        for future in as_completed(futures):
-            mejor_local, menor_local = future.result()
-            if menor_local < menor_global:
-                menor_global = menor_local
-                mejor_global = mejor_local
+
+def procesar_lote_prefijos(prefijos):
+    """
+    Recorre en profundidad cada prefijo del lote partiendo de la cota global
+    compartida y la actualiza si la mejora. Devuelve (mejor_ruta, distancia,
+    pid, segundos ocupados, prefijos procesados) para que el planificador
+    mida la latencia y la utilización de cada proceso.
+    """
+    inicio = time.perf_counter()
+    filas = filas_compartidas()
+    incumbente = _compartido["incumbente"]
+    mejor_lote, menor_lote = None, float('inf')
+    for prefijo in prefijos:
+        mejor, menor, _ = recorrer_dfs(filas, prefijo, incumbente.value)
+        if mejor is not None and menor < menor_lote:
+            mejor_lote, menor_lote = mejor, menor
+            with incumbente.get_lock():
+                if menor < incumbente.value:
+                    incumbente.value = menor
+    return mejor_lote, menor_lote, os.getpid(), time.perf_counter() - inicio, len(prefijos)
+
+
+class PlanificadorLotes:
+    """
+    Reparte prefijos en lotes cuyo tamaño se ajusta a la latencia medida: con
+    un promedio móvil de segundos por prefijo, cada lote nuevo lleva los
+    prefijos necesarios para durar aproximadamente LATENCIA_OBJETIVO.
+
+    Se itera desde el hilo que alimenta al Pool; como máximo `en_vuelo` lotes
+    esperan sin resultado, así el tamaño se decide con mediciones recientes
+    en lugar de repartir todo al inicio. Ningún lote supera 1/en_vuelo de
+    los prefijos restantes.
+
+    Solo registrar() libera cupos, y se llama desde el ciclo principal: si ese
+    ciclo se interrumpe (por ejemplo, un proceso lanzó una excepción), hay que
+    llamar a detener() para que el hilo alimentador no quede bloqueado
+    esperando un cupo y el Pool pueda cerrarse.
+    """
+
+    def __init__(self, prefijos, en_vuelo):
+        self.prefijos = prefijos
+        self.siguiente = 0
+        self.en_vuelo = en_vuelo
+        self.segundos_por_prefijo = None
+        self.cupos = threading.Semaphore(en_vuelo)
+        self.detenido = False
+        self.tamanos = []
+
+    def tamano_lote(self):
+        if self.segundos_por_prefijo is None:
+            return 1
+        tamano = round(LATENCIA_OBJETIVO / max(self.segundos_por_prefijo, 1e-9))
+        # Nunca más que una parte proporcional de lo que queda, para que el final
+        # del reparto no dependa de un único lote grande
+        restantes = len(self.prefijos) - self.siguiente
+        return max(1, min(tamano, math.ceil(restantes / self.en_vuelo)))
+
+    def __iter__(self):
+        while self.siguiente < len(self.prefijos):
+            self.cupos.acquire()
+            if self.detenido:
+                return
+            tamano = self.tamano_lote()
+            self.tamanos.append(tamano)
+            lote = self.prefijos[self.siguiente:self.siguiente + tamano]
+            self.siguiente += tamano
+            yield lote
+
+    def registrar(self, segundos, procesados):
+        """Actualiza la latencia por prefijo con un lote terminado y libera su cupo."""
+        medida = segundos / procesados
+        if self.segundos_por_prefijo is None:
+            self.segundos_por_prefijo = medida
+        else:
+            self.segundos_por_prefijo += SUAVIZADO * (medida - self.segundos_por_prefijo)
+        self.cupos.release()
+
+    def detener(self):
+        """Termina el reparto y despierta al hilo alimentador si espera un cupo."""
+        self.detenido = True
+        self.cupos.release(self.en_vuelo)
+
+
+def viajero_paralelo_dinamico(matriz, n_processes):
+    inicio = time.perf_counter()
+
+    mejor_global = vecino_mas_cercano(matriz)
+    menor_global = calcular_distancia_total(mejor_global, matriz)
+    prefijos = generar_prefijos(len(matriz), TAREAS_POR_PROCESO * n_processes)
+    planificador = PlanificadorLotes(prefijos, en_vuelo=2 * n_processes)
+    ocupado = {}
+
+    shm = shared_memory.SharedMemory(create=True, size=matriz.nbytes)
+    matriz_compartida = np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=shm.buf)
+    np.copyto(matriz_compartida, matriz)
+    incumbente = Value('d', menor_global)
+
+    try:
+        with Pool(
+            processes=n_processes,
+            initializer=adjuntar_matriz,
+            initargs=(shm.name, matriz.shape, matriz.dtype, incumbente),
+        ) as pool:
+            inicio_pool = time.perf_counter()
+            try:
+                for mejor_local, menor_local, pid, segundos, procesados in pool.imap_unordered(
+                    procesar_lote_prefijos, planificador
+                ):
+                    planificador.registrar(segundos, procesados)
+                    ocupado[pid] = ocupado.get(pid, 0.0) + segundos
+                    if menor_local < menor_global:
+                        menor_global = menor_local
+                        mejor_global = mejor_local
+            finally:
+                # Sin esto, un error en un proceso deja al alimentador del Pool
+                # esperando un cupo y el cierre del Pool no termina nunca
+                planificador.detener()
+            tiempo_pool = time.perf_counter() - inicio_pool
+    finally:
+        del matriz_compartida
+        shm.close()
+        shm.unlink()
 
     fin = time.perf_counter()
     tiempo = fin - inicio
 
-    print("\n⚙️ [Paralelo - ProcessPoolExecutor]")
+    print("\n📦 [Paralelo - planificador dinámico]")
     print("Mejor ruta:", mejor_global)
     print("Distancia mínima:", round(menor_global, 2))
+    print(f"Prefijos: {len(prefijos)} en {len(planificador.tamanos)} lotes "
+          f"(tamaño {min(planificador.tamanos)}-{max(planificador.tamanos)})")
+    print("Utilización por proceso:")
+    for pid, segundos in sorted(ocupado.items()):
+        print(f"  PID {pid}: {100 * segundos / tiempo_pool:5.1f}%")
+    print(f"Utilización media: {100 * sum(ocupado.values()) / (n_processes * tiempo_pool):.1f}%")
     print(f"Tiempo de ejecución: {tiempo:.6f} segundos")
 
     return mejor_global, menor_global, tiempo
@@ -123,37 +419,92 @@ def graficar_ruta(ciudades, ruta, titulo, tiempo):
     for i, (cx, cy) in enumerate(ciudades):
         plt.text(cx + 1, cy + 1, str(i + 1), fontsize=8, color='red')
 
-    plt.title(f"{titulo}\nTiempo: {tiempo:.4f} s")
+    detalle = "resultado en caché" if tiempo is None else f"Tiempo: {tiempo:.4f} s"
+    plt.title(f"{titulo}\n{detalle}")
     plt.xlabel("Coordenada X")
     plt.ylabel("Coordenada Y")
     plt.grid(True)
     plt.show()
 
 
+# === CACHÉ DE RESULTADOS ===
+def ejecutar_con_cache(nombre, instancia, usar_cache, motor, *args):
+    """
+    Devuelve (ruta, distancia, tiempo) de motor(*args) y guarda la ruta en la
+    caché de tsp_comun. Si la instancia ya estaba resuelta con ese motor, la
+    devuelve sin ejecutarlo y con tiempo None: un tiempo de otra corrida no
+    sirve para calcular aceleraciones.
+    """
+    guardado = cached_result(instancia, nombre) if usar_cache else None
+    if guardado:
+        distancia, ruta = guardado
+        print(f"\n♻️ [{nombre}] resultado en caché (distancia {distancia:.2f})")
+        return ruta, distancia, None
+    ruta, distancia, tiempo = motor(*args)
+    store_result(instancia, nombre, float(distancia), [int(c) for c in ruta])
+    return ruta, distancia, tiempo
+
+
 # === MAIN ===
 def main():
     print("=== PROBLEMA DEL VIAJERO (TSP) ===")
-    n = int(input("Ingrese el número de ciudades (≤10 recomendado): "))
+    parser = argparse.ArgumentParser(description="Problema del viajero: secuencial vs paralelo")
+    parser.add_argument("--ciudades", type=int, help="número de ciudades (si falta, se pregunta)")
+    parser.add_argument("--semilla", type=int, help="semilla de la generación aleatoria")
+    parser.add_argument("--instancia", help="archivo TSPLIB (.tsp) o CSV con las ciudades")
+    parser.add_argument("--sin-cache", action="store_true", help="no reutilizar resultados guardados")
+    args = parser.parse_args()
     n_processes = min(4, cpu_count())
 
-    ciudades = generar_ciudades(n)
-    matriz = calcular_matriz_distancias(ciudades)
-    rutas = generar_rutas(ciudades)
+    if args.instancia:
+        ciudades = points_from_cities(load_instance(args.instancia))
+        print(f"Instancia {args.instancia}: {len(ciudades)} ciudades")
+    else:
+        n = args.ciudades if args.ciudades is not None else int(input("Ingrese el número de ciudades (≤10 recomendado): "))
+        ciudades = generar_ciudades(n, semilla=args.semilla)
+    n = len(ciudades)
+    instancia = cities_from_points(ciudades)
+    matriz = cached_matrix(instancia, lambda _: calcular_matriz_distancias(ciudades))
+    usar_cache = not args.sin_cache
 
-    # Secuencial
-    mejor_ruta_seq, dist_seq, t_seq = viajero_secuencial(matriz, rutas)
+    # Los cuatro motores son exactos: la caché se indexa por motor y número de procesos
+    mejor_ruta_seq, dist_seq, t_seq = ejecutar_con_cache(
+        f"clase-secuencial/{n_processes}", instancia, usar_cache,
+        viajero_secuencial, matriz, generar_rutas_por_bloques(n))
 
     # Paralelo
-    mejor_ruta_par, dist_par, t_par = viajero_paralelo(matriz, rutas, n_processes)
+    mejor_ruta_par, dist_par, t_par = ejecutar_con_cache(
+        f"clase-paralelo/{n_processes}", instancia, usar_cache,
+        viajero_paralelo, matriz, generar_rutas_por_bloques(n), n_processes)
+
+    # Paralelo en profundidad
+    mejor_ruta_dfs, dist_dfs, t_dfs = ejecutar_con_cache(
+        f"clase-paralelo-dfs/{n_processes}", instancia, usar_cache,
+        viajero_paralelo_dfs, matriz, n_processes)
+
+    # Paralelo con planificador dinámico
+    mejor_ruta_din, dist_din, t_din = ejecutar_con_cache(
+        f"clase-paralelo-dinamico/{n_processes}", instancia, usar_cache,
+        viajero_paralelo_dinamico, matriz, n_processes)
 
     # Graficar
     graficar_ruta(ciudades, mejor_ruta_seq, "Ruta Óptima - Secuencial", t_seq)
     graficar_ruta(ciudades, mejor_ruta_par, "Ruta Óptima - Paralelo", t_par)
+    graficar_ruta(ciudades, mejor_ruta_dfs, "Ruta Óptima - Paralelo DFS", t_dfs)
+    graficar_ruta(ciudades, mejor_ruta_din, "Ruta Óptima - Paralelo dinámico", t_din)
+
+    def formato(tiempo):
+        return "en caché (tiempo no medido)" if tiempo is None else f"{tiempo:.4f} s"
 
     print("\n📊 Comparación final:")
-    print(f"Tiempo Secuencial: {t_seq:.4f} s")
-    print(f"Tiempo Paralelo ({n_processes} procesos): {t_par:.4f} s")
-    print(f"Aceleración: {t_seq / t_par:.2f}x")
+    print(f"Tiempo Secuencial: {formato(t_seq)}")
+    print(f"Tiempo Paralelo ({n_processes} procesos): {formato(t_par)}")
+    print(f"Tiempo Paralelo DFS ({n_processes} procesos): {formato(t_dfs)}")
+    print(f"Tiempo Paralelo dinámico ({n_processes} procesos): {formato(t_din)}")
+    # Las aceleraciones solo comparan motores ejecutados en esta corrida
+    for etiqueta, tiempo in (("Aceleración", t_par), ("Aceleración DFS", t_dfs), ("Aceleración dinámico", t_din)):
+        if t_seq is not None and tiempo is not None:
+            print(f"{etiqueta}: {t_seq / tiempo:.2f}x")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+import contextlib
+import io
+
+from salesman_secuencialParalel import (
+    calcular_matriz_distancias,
+    generar_ciudades,
+    held_karp_viajero,
+    secuencial_viajero,
+)
+from tsp_comun.enumeracion import generar_rutas_por_bloques
+
+# ==========================
+# PARÁMETROS
+# ==========================
+
+CIUDADES = range(8, 21)
+# Por encima de este tamaño la fuerza bruta ((n-1)! rutas) tarda horas
+LIMITE_SECUENCIAL = 10
+
+
+def silencioso(motor, *args):
+    """Ejecuta un motor descartando lo que imprime en consola."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return motor(*args)
+
+
+def main():
+    print("=== HELD-KARP vs SECUENCIAL (fuerza bruta) ===\n")
+    print(f"{'Ciudades':>8} | {'Secuencial (s)':>14} | {'Held-Karp (s)':>13} | {'Aceleración':>11}")
+    print("-" * 56)
+
+    for n in CIUDADES:
+        ciudades = generar_ciudades(n)
+        matriz = calcular_matriz_distancias(ciudades)
+        _, dist_hk, tiempo_hk = silencioso(held_karp_viajero, matriz)
+
+        if n <= LIMITE_SECUENCIAL:
+            _, dist_seq, tiempo_seq = silencioso(secuencial_viajero, matriz, generar_rutas_por_bloques(n))
+            assert abs(dist_seq - dist_hk) < 1e-6 * dist_seq
+            print(f"{n:8d} | {tiempo_seq:14.4f} | {tiempo_hk:13.4f} | {tiempo_seq / tiempo_hk:10.2f}x")
+        else:
+            print(f"{n:8d} | {'-':>14} | {tiempo_hk:13.4f} | {'-':>11}")
+
+
+if __name__ == "__main__":
+    main()
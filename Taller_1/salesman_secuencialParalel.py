@@ -1,31 +1,51 @@
+import argparse
 import random
 import math
 import itertools
 import time
 import os
+import numpy as np
 import matplotlib.pyplot as plt
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Pool, cpu_count, shared_memory
+
+from tsp_comun.checkpoint import Checkpoint, load_checkpoint_cities
+from tsp_comun.enumeracion import generar_rutas_por_bloques, permutaciones_canonicas
+from tsp_comun.instances import (
+    cached_matrix, cached_result, cities_from_points, load_instance, points_from_cities, store_result,
+)
+from tsp_comun.recorrido_dfs import generar_prefijos, recorrer_dfs
+from viajero_heuristico import busqueda_local, multiarranque
 
 # ==========================
 # FUNCIONES AUXILIARES
 # ==========================
 
-def generar_ciudades(n_ciudades, rango=100):
-    """Genera una lista de ciudades con coordenadas (x, y) aleatorias."""
-    return [(random.randint(0, rango), random.randint(0, rango)) for _ in range(n_ciudades)]
+def generar_ciudades(n_ciudades, rango=100, semilla=None):
+    """Genera una lista de ciudades con coordenadas (x, y) aleatorias (reproducibles con `semilla`)."""
+    rng = random.Random(semilla)
+    return [(rng.randint(0, rango), rng.randint(0, rango)) for _ in range(n_ciudades)]
+
+
+def calcular_matriz_distancias_np(ciudades):
+    """Crea la matriz NumPy (n x n) de distancias euclidianas por broadcasting, sin bucles de Python."""
+    coords = np.asarray(ciudades, dtype=np.float64).reshape(-1, 2)
+    dx = np.subtract.outer(coords[:, 0], coords[:, 0])
+    dy = np.subtract.outer(coords[:, 1], coords[:, 1])
+    return np.hypot(dx, dy, out=dx)
 
 
 def calcular_matriz_distancias(ciudades):
-    """Crea una matriz de distancias euclidianas entre todas las ciudades."""
-    n = len(ciudades)
-    matriz = [[0.0 for _ in range(n)] for _ in range(n)]
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                x1, y1 = ciudades[i]
-                x2, y2 = ciudades[j]
-                matriz[i][j] = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-    return matriz
+    """Crea una matriz de distancias euclidianas entre todas las ciudades (lista de listas)."""
+    return calcular_matriz_distancias_np(ciudades).tolist()
+
+
+def aplanar_matriz(matriz):
+    """
+    Devuelve la matriz como un buffer contiguo de n*n float64 junto con n;
+    la distancia i -> j está en la posición i*n + j.
+    """
+    M = np.ascontiguousarray(matriz, dtype=np.float64)
+    return M.ravel(), M.shape[0]
 
 
 def graficar_ciudades(ciudades):
@@ -46,14 +66,15 @@ def graficar_ciudades(ciudades):
 
 
 def graficar_ruta(ciudades, ruta, tiempo, tipo="Secuencial"):
-    """Grafica la mejor ruta encontrada."""
+    """Grafica la mejor ruta encontrada (tiempo=None: resultado leído de la caché)."""
     plt.figure(figsize=(6, 6))
     x = [ciudades[i][0] for i in ruta]
     y = [ciudades[i][1] for i in ruta]
     plt.plot(x, y, '-o', color='green')
     for i, (cx, cy) in enumerate(ciudades):
         plt.text(cx + 1, cy + 1, str(i + 1), fontsize=9, color='red')
-    plt.title(f"Mejor Ruta ({tipo}) - Tiempo: {tiempo:.4f}s")
+    detalle = "en caché" if tiempo is None else f"Tiempo: {tiempo:.4f}s"
+    plt.title(f"Mejor Ruta ({tipo}) - {detalle}")
     plt.xlabel("Coordenada X")
     plt.ylabel("Coordenada Y")
     plt.grid(True)
@@ -66,32 +87,71 @@ def graficar_ruta(ciudades, ruta, tiempo, tipo="Secuencial"):
 # CÁLCULOS DE DISTANCIA Y RUTAS
 # ==========================
 
-def generar_rutas(ciudades):
-    """Genera todas las rutas posibles empezando desde la ciudad 0."""
-    n = len(ciudades)
-    indices = list(range(n))
-    ciudad_inicial = indices[0]
-    otras_ciudades = indices[1:]
-    rutas = [[ciudad_inicial] + list(perm) + [ciudad_inicial] for perm in itertools.permutations(otras_ciudades)]
-    return rutas
-
-
 def calcular_distancia_total(ruta, matriz):
     """Calcula la distancia total de una ruta."""
     return sum(matriz[ruta[i]][ruta[i + 1]] for i in range(len(ruta) - 1))
 
 
+def distancias_bloque(bloque, matriz):
+    """
+    Calcula de una sola vez la distancia de las k rutas de un bloque (k x n+1)
+    indexando la matriz con los pares (origen, destino) de cada arista.
+    """
+    return matriz[bloque[:, :-1], bloque[:, 1:]].sum(axis=1)
+
+
+def distancias_bloque_plano(bloque, plano, n):
+    """
+    Variante de distancias_bloque sobre la matriz aplanada: convierte cada
+    arista en su desplazamiento i*n + j y lee todas con un solo np.take.
+    """
+    desplazamientos = bloque[:, :-1] * n
+    desplazamientos += bloque[:, 1:]
+    return np.take(plano, desplazamientos).sum(axis=1)
+
+
+def mejor_de_bloque(bloque, matriz):
+    """Devuelve (ruta, distancia) de la ruta más corta de un bloque."""
+    distancias = distancias_bloque(bloque, matriz)
+    i = int(np.argmin(distancias))
+    return bloque[i].tolist(), float(distancias[i])
+
+
 # ==========================
 # VERSIÓN SECUENCIAL
 # ==========================
 
-def secuencial_viajero(matriz, rutas):
+def secuencial_viajero(matriz, bloques):
     inicio = time.perf_counter()
     mejor_ruta = None
     menor_distancia = float('inf')
 
-    for ruta in rutas:
-        distancia = calcular_distancia_total(ruta, matriz)
+    for bloque in bloques:
+        for ruta in bloque.tolist():
+            distancia = calcular_distancia_total(ruta, matriz)
+            if distancia < menor_distancia:
+                menor_distancia = distancia
+                mejor_ruta = ruta
+
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    print("🧭 Mejor ruta (Secuencial):", mejor_ruta)
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"⏱ Tiempo secuencial: {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+def secuencial_vectorizado_viajero(matriz, bloques):
+    """Igual que secuencial_viajero, pero evalúa cada bloque con el kernel NumPy."""
+    inicio = time.perf_counter()
+    M = np.asarray(matriz, dtype=np.float64)
+    mejor_ruta = None
+    menor_distancia = float('inf')
+
+    for bloque in bloques:
+        ruta, distancia = mejor_de_bloque(bloque, M)
         if distancia < menor_distancia:
             menor_distancia = distancia
             mejor_ruta = ruta
@@ -99,9 +159,52 @@ def secuencial_viajero(matriz, rutas):
     fin = time.perf_counter()
     tiempo_total = fin - inicio
 
-    print("🧭 Mejor ruta (Secuencial):", mejor_ruta)
+    print("🧭 Mejor ruta (Secuencial vectorizado):", mejor_ruta)
     print("Distancia mínima:", round(menor_distancia, 2))
-    print(f"⏱ Tiempo secuencial: {tiempo_total:.4f} segundos\n")
+    print(f"⏱ Tiempo secuencial vectorizado: {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+def secuencial_plano_viajero(matriz, bloques):
+    """Igual que secuencial_vectorizado_viajero, pero sobre la matriz aplanada (desplazamientos i*n + j)."""
+    inicio = time.perf_counter()
+    plano, n = aplanar_matriz(matriz)
+    mejor_ruta = None
+    menor_distancia = float('inf')
+
+    for bloque in bloques:
+        distancias = distancias_bloque_plano(bloque, plano, n)
+        i = int(np.argmin(distancias))
+        if distancias[i] < menor_distancia:
+            menor_distancia = float(distancias[i])
+            mejor_ruta = bloque[i].tolist()
+
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    print("🧭 Mejor ruta (Secuencial plano):", mejor_ruta)
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"⏱ Tiempo secuencial plano: {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+# ==========================
+# VERSIÓN SECUENCIAL EN PROFUNDIDAD (costo incremental)
+# ==========================
+
+def secuencial_dfs_viajero(matriz):
+    inicio = time.perf_counter()
+    mejor_ruta, menor_distancia, hojas = recorrer_dfs(matriz)
+
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    print("🧭 Mejor ruta (Secuencial DFS):", mejor_ruta)
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"Rutas completas evaluadas: {hojas}")
+    print(f"⏱ Tiempo secuencial DFS: {tiempo_total:.4f} segundos\n")
 
     return mejor_ruta, menor_distancia, tiempo_total
 
@@ -110,24 +213,35 @@ def secuencial_viajero(matriz, rutas):
 # VERSIÓN PARALELA (Pool)
 # ==========================
 
-def _worker_ruta(ruta_matriz):
-    """Función auxiliar para evaluar una ruta (para usar con Pool)."""
-    ruta, matriz = ruta_matriz
-    return calcular_distancia_total(ruta, matriz)
+def _worker_bloque(bloque_matriz):
+    """Función auxiliar: mejor ruta de un bloque de rutas (para usar con Pool)."""
+    bloque, matriz = bloque_matriz
+    mejor_ruta = None
+    menor_distancia = float('inf')
+    for ruta in bloque.tolist():
+        distancia = calcular_distancia_total(ruta, matriz)
+        if distancia < menor_distancia:
+            menor_distancia = distancia
+            mejor_ruta = ruta
+    return mejor_ruta, menor_distancia
 
 
-def paralelo_viajero(matriz, rutas, n_processes):
+def paralelo_viajero(matriz, bloques, n_processes):
     inicio = time.perf_counter()
-
-    # Preparamos las rutas junto con la matriz (para evitar variables globales)
-    datos = [(ruta, matriz) for ruta in rutas]
+    mejor_ruta = None
+    menor_distancia = float('inf')
 
     with Pool(processes=n_processes) as pool:
-        distancias = pool.map(_worker_ruta, datos)
-
-    # Encontrar la mejor ruta
-    menor_distancia = min(distancias)
-    mejor_ruta = rutas[distancias.index(menor_distancia)]
+        # Se despachan oleadas de 2 bloques por proceso para no adelantar
+        # la generación de rutas más allá de lo que el Pool está evaluando
+        while True:
+            oleada = [(bloque, matriz) for bloque in itertools.islice(bloques, 2 * n_processes)]
+            if not oleada:
+                break
+            for ruta, distancia in pool.map(_worker_bloque, oleada):
+                if distancia < menor_distancia:
+                    menor_distancia = distancia
+                    mejor_ruta = ruta
 
     fin = time.perf_counter()
     tiempo_total = fin - inicio
@@ -139,38 +253,531 @@ def paralelo_viajero(matriz, rutas, n_processes):
     return mejor_ruta, menor_distancia, tiempo_total
 
 
+# ==========================
+# VERSIÓN PARALELA (generación local en cada proceso)
+# ==========================
+
+# Matriz de cada proceso del Pool (asignada una sola vez por _iniciar_matriz)
+_viajero = {}
+
+
+def _iniciar_matriz(matriz):
+    """Inicializador del Pool: cada proceso recibe la matriz una única vez."""
+    _viajero["matriz"] = matriz
+
+
+def _worker_prefijo(prefijo):
+    """Función auxiliar: genera localmente las rutas que empiezan por el prefijo y devuelve la mejor."""
+    matriz = _viajero["matriz"]
+    n = len(matriz)
+    inicio = [0, *prefijo]
+    costo_prefijo = calcular_distancia_total(inicio, matriz)
+    largo = len(prefijo)
+
+    mejor_ruta = None
+    menor_distancia = float('inf')
+    # Solo un sentido de cada ciclo; un prefijo sin completaciones canónicas no genera nada
+    for perm in permutaciones_canonicas(range(1, n), prefijo):
+        cola = [inicio[-1], *perm[largo:], 0]
+        distancia = costo_prefijo + calcular_distancia_total(cola, matriz)
+        if distancia < menor_distancia:
+            menor_distancia = distancia
+            mejor_ruta = [0, *perm, 0]
+    return mejor_ruta, menor_distancia
+
+
+def _worker_prefijo_rango(tarea):
+    """Como _worker_prefijo, pero recibe (inicio, fin, prefijo) y devuelve el intervalo junto al resultado."""
+    inicio, fin, prefijo = tarea
+    return inicio, fin, *_worker_prefijo(prefijo)
+
+
+def paralelo_local_viajero(matriz, n_processes, punto_control=None):
+    """
+    Variante paralela sin tráfico de rutas: la matriz viaja una vez por
+    proceso (initializer) y cada tarea es solo un prefijo de ruta.
+
+    Los prefijos de largo L salen en orden lexicográfico, así que el i-ésimo
+    cubre los rangos [i * (n-1-L)!, (i+1) * (n-1-L)!) de las permutaciones de
+    las ciudades 1..n-1. Con un Checkpoint se registra cada intervalo al
+    terminar y, al reanudar, se omiten los ya evaluados.
+    """
+    inicio = time.perf_counter()
+    mejor_ruta = None
+    menor_distancia = float('inf')
+
+    prefijos = generar_prefijos(len(matriz), 4 * n_processes)
+    tamano = math.factorial(len(matriz) - 1 - len(prefijos[0])) if len(matriz) > 1 else 1
+    tareas = [(i * tamano, (i + 1) * tamano, prefijo) for i, prefijo in enumerate(prefijos)]
+    if punto_control:
+        tareas = [t for t in tareas if not punto_control.is_done(t[0], t[1])]
+        if punto_control.best_route is not None:
+            mejor_ruta, menor_distancia = punto_control.best_route, punto_control.best_distance
+
+    with Pool(processes=n_processes, initializer=_iniciar_matriz, initargs=(matriz,)) as pool:
+        for desde, hasta, ruta, distancia in pool.imap_unordered(_worker_prefijo_rango, tareas):
+            if distancia < menor_distancia:
+                menor_distancia = distancia
+                mejor_ruta = ruta
+            if punto_control:
+                punto_control.complete(desde, hasta, distancia, ruta)
+    if punto_control:
+        punto_control.save()
+
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    print("🧭 Mejor ruta (Paralelo, generación local):", mejor_ruta)
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"⏱ Tiempo paralelo local ({n_processes} procesos, {len(tareas)} de {len(prefijos)} prefijos): {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+# ==========================
+# VERSIÓN BRANCH AND BOUND
+# ==========================
+
+def vecino_mas_cercano(matriz, ciudad_inicial=0):
+    """Construye una ruta cerrada eligiendo siempre la ciudad no visitada más cercana."""
+    n = len(matriz)
+    ruta = [ciudad_inicial]
+    visitadas = {ciudad_inicial}
+    while len(ruta) < n:
+        actual = ruta[-1]
+        siguiente = min((j for j in range(n) if j not in visitadas), key=lambda j: matriz[actual][j])
+        ruta.append(siguiente)
+        visitadas.add(siguiente)
+    ruta.append(ciudad_inicial)
+    return ruta, calcular_distancia_total(ruta, matriz)
+
+
+def branch_and_bound_viajero(matriz):
+    """
+    Búsqueda exacta en profundidad que descarta una rama cuando
+    costo parcial + cota inferior >= mejor distancia conocida.
+
+    La cota inferior suma, para la ciudad actual y cada ciudad no visitada,
+    su arista de salida más corta (cada una debe salir exactamente una vez
+    más antes de cerrar el ciclo). La primera cota superior es la ruta del
+    vecino más cercano.
+    """
+    inicio = time.perf_counter()
+    n = len(matriz)
+
+    mejor_ruta, menor_distancia = vecino_mas_cercano(matriz)
+    nodos = 0
+    if n < 4:
+        # Con 3 ciudades o menos solo hay un ciclo posible (más su reverso)
+        return _reportar_branch_and_bound(mejor_ruta, menor_distancia, nodos, inicio)
+
+    min_salida = [min(matriz[i][j] for j in range(n) if j != i) for i in range(n)]
+    # Vecinos de cada ciudad ordenados por distancia: las ramas prometedoras primero
+    vecinos = [sorted((j for j in range(n) if j != i), key=lambda j: matriz[i][j]) for i in range(n)]
+
+    ruta = [0]
+    visitada = [False] * n
+    visitada[0] = True
+
+    def explorar(actual, costo, cota_restante):
+        # cota_restante: suma de min_salida de las ciudades aún no visitadas
+        nonlocal mejor_ruta, menor_distancia, nodos
+        nodos += 1
+        if len(ruta) == n:
+            total = costo + matriz[actual][0]
+            if total < menor_distancia:
+                menor_distancia = total
+                mejor_ruta = ruta + [0]
+            return
+
+        for j in vecinos[actual]:
+            if visitada[j]:
+                continue
+            nuevo_costo = costo + matriz[actual][j]
+            # Los vecinos están ordenados: si este supera la cota, los siguientes también
+            if nuevo_costo + cota_restante >= menor_distancia:
+                break
+            visitada[j] = True
+            ruta.append(j)
+            explorar(j, nuevo_costo, cota_restante - min_salida[j])
+            ruta.pop()
+            visitada[j] = False
+
+    explorar(0, 0.0, sum(min_salida[1:]))
+
+    return _reportar_branch_and_bound(mejor_ruta, menor_distancia, nodos, inicio)
+
+
+def _reportar_branch_and_bound(mejor_ruta, menor_distancia, nodos, inicio):
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    print("🧭 Mejor ruta (Branch and Bound):", mejor_ruta)
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"Nodos explorados: {nodos}")
+    print(f"⏱ Tiempo branch and bound: {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+# ==========================
+# VERSIÓN HELD-KARP (programación dinámica)
+# ==========================
+
+def _capas_held_karp(m):
+    """Agrupa las máscaras de m bits por número de ciudades (cardinalidad)."""
+    mascaras = np.arange(1 << m, dtype=np.int64)
+    bits = np.zeros(1 << m, dtype=np.uint8)
+    for b in range(m):
+        bits += ((mascaras >> b) & 1).astype(np.uint8)
+    orden = np.argsort(bits, kind="stable")
+    limites = np.searchsorted(bits[orden], np.arange(m + 2))
+    return [orden[limites[k]:limites[k + 1]] for k in range(m + 1)]
+
+
+def _relajar_columna(costos, padres, D, capa, j):
+    """
+    Calcula costos[S, j] para todas las máscaras S de la capa que contienen j:
+    el mínimo sobre i de costos[S sin j, i] + D[i, j].
+    """
+    bit = 1 << j
+    sel = capa[(capa & bit) != 0]
+    candidatos = costos[sel ^ bit] + D[:, j]
+    mejor = np.argmin(candidatos, axis=1)
+    padres[sel, j] = mejor
+    costos[sel, j] = candidatos[np.arange(len(sel)), mejor]
+
+
+# Estado de cada proceso del barrido paralelo (asignado por _iniciar_held_karp)
+_hk = {}
+
+
+def _iniciar_held_karp(nombre_costos, nombre_padres, m, D):
+    """Inicializador del Pool: adjunta las tablas compartidas una sola vez por proceso."""
+    _hk["shm"] = [shared_memory.SharedMemory(name=nombre_costos),
+                  shared_memory.SharedMemory(name=nombre_padres)]
+    _hk["costos"] = np.ndarray((1 << m, m), dtype=np.float32, buffer=_hk["shm"][0].buf)
+    _hk["padres"] = np.ndarray((1 << m, m), dtype=np.uint8, buffer=_hk["shm"][1].buf)
+    _hk["capas"] = _capas_held_karp(m)
+    _hk["D"] = D
+
+
+def _worker_held_karp(tarea):
+    """Función auxiliar: relaja la columna j de la capa k (para usar con Pool)."""
+    k, j = tarea
+    _relajar_columna(_hk["costos"], _hk["padres"], _hk["D"], _hk["capas"][k], j)
+
+
+def held_karp_viajero(matriz, n_processes=None):
+    """
+    Resuelve el TSP de forma exacta en O(n²·2ⁿ) con programación dinámica
+    sobre subconjuntos (Held-Karp).
+
+    costos[S, j] es la longitud mínima de un camino que sale de la ciudad 0,
+    visita exactamente las ciudades de la máscara S y termina en j. Cada capa
+    (|S| fijo) se calcula con operaciones vectorizadas de NumPy. Las tablas
+    usan float32 y los predecesores uint8 para que n = 20 quepa en ~50 MB.
+    Con n_processes > 1 las columnas de cada capa se reparten entre procesos
+    que escriben directamente en memoria compartida.
+    """
+    inicio = time.perf_counter()
+    n = len(matriz)
+    m = n - 1  # ciudades distintas de la inicial
+
+    if m < 2:
+        mejor_ruta = list(range(n)) + [0]
+        return _reportar_held_karp(mejor_ruta, calcular_distancia_total(mejor_ruta, matriz), inicio, n_processes)
+
+    M = np.asarray(matriz, dtype=np.float32)
+    D = np.ascontiguousarray(M[1:, 1:])
+    forma = (1 << m, m)
+    paralelo = n_processes is not None and n_processes > 1
+
+    if paralelo:
+        shm_costos = shared_memory.SharedMemory(create=True, size=forma[0] * forma[1] * 4)
+        shm_padres = shared_memory.SharedMemory(create=True, size=forma[0] * forma[1])
+        costos = np.ndarray(forma, dtype=np.float32, buffer=shm_costos.buf)
+        padres = np.ndarray(forma, dtype=np.uint8, buffer=shm_padres.buf)
+    else:
+        costos = np.empty(forma, dtype=np.float32)
+        padres = np.empty(forma, dtype=np.uint8)
+    costos.fill(np.inf)
+    padres.fill(0)
+
+    # Capa 1: caminos 0 -> j
+    columnas = np.arange(m)
+    costos[1 << columnas, columnas] = M[0, 1:]
+
+    capas = _capas_held_karp(m)
+    if paralelo:
+        try:
+            with Pool(processes=n_processes, initializer=_iniciar_held_karp,
+                      initargs=(shm_costos.name, shm_padres.name, m, D)) as pool:
+                for k in range(2, m + 1):
+                    # Las columnas de una capa son independientes entre sí
+                    pool.map(_worker_held_karp, [(k, j) for j in range(m)])
+            mejor_ruta = _reconstruir_held_karp(costos, padres, M, m)
+        finally:
+            del costos, padres
+            for shm in (shm_costos, shm_padres):
+                shm.close()
+                shm.unlink()
+    else:
+        for k in range(2, m + 1):
+            for j in range(m):
+                _relajar_columna(costos, padres, D, capas[k], j)
+        mejor_ruta = _reconstruir_held_karp(costos, padres, M, m)
+
+    # La distancia final se recalcula en doble precisión sobre la ruta óptima
+    menor_distancia = calcular_distancia_total(mejor_ruta, matriz)
+    return _reportar_held_karp(mejor_ruta, menor_distancia, inicio, n_processes)
+
+
+def _reconstruir_held_karp(costos, padres, M, m):
+    """Cierra el ciclo y sigue los predecesores desde la máscara completa."""
+    completa = (1 << m) - 1
+    j = int(np.argmin(costos[completa] + M[1:, 0]))
+    mascara = completa
+    recorrido = []
+    while mascara:
+        recorrido.append(j + 1)
+        anterior = int(padres[mascara, j])
+        mascara ^= 1 << j
+        j = anterior
+    return [0] + recorrido[::-1] + [0]
+
+
+def _reportar_held_karp(mejor_ruta, menor_distancia, inicio, n_processes):
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    etiqueta = f"{n_processes} procesos" if n_processes and n_processes > 1 else "1 proceso"
+    print("🧭 Mejor ruta (Held-Karp):", mejor_ruta)
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"⏱ Tiempo Held-Karp ({etiqueta}): {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+# ==========================
+# VERSIÓN HEURÍSTICA (instancias grandes)
+# ==========================
+
+# Presupuesto de tiempo de la búsqueda local, en segundos
+TIEMPO_HEURISTICO = 10.0
+
+
+def cerrar_en_origen(recorrido):
+    """Rota un ciclo (arreglo de n ciudades) para que empiece en la ciudad 0 y lo cierra."""
+    recorrido = np.roll(recorrido, -int(np.flatnonzero(recorrido == 0)[0]))
+    return recorrido.tolist() + [0]
+
+
+def heuristico_viajero(matriz, limite_s=TIEMPO_HEURISTICO):
+    """
+    Vecino más cercano + búsqueda local 2-opt / Or-opt con presupuesto de
+    tiempo. No garantiza el óptimo, pero escala a cientos o miles de ciudades.
+    """
+    inicio = time.perf_counter()
+    recorrido, _, historial = busqueda_local(np.asarray(matriz, dtype=np.float64), limite_s)
+    mejor_ruta = cerrar_en_origen(recorrido)
+    menor_distancia = calcular_distancia_total(mejor_ruta, matriz)
+
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+
+    print("📈 Calidad vs tiempo (heurístico):")
+    inicial = historial[0][1]
+    for segundos, distancia, etapa in historial:
+        mejora = 100 * (inicial - distancia) / inicial if inicial else 0.0
+        print(f"  {segundos:8.3f} s | {distancia:12.2f} | -{mejora:5.2f}% | {etapa}")
+    print("🧭 Mejor ruta (Heurístico):", mejor_ruta if len(mejor_ruta) <= 30 else f"{len(mejor_ruta) - 1} ciudades")
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"⏱ Tiempo heurístico (límite {limite_s:.1f} s): {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+TIEMPO_MULTIARRANQUE = 10.0
+# Iteraciones por segundo de cada corrida de multiarranque, según el motor ("ils" o "multiarranque")
+RENDIMIENTO_MULTIARRANQUE = {}
+
+
+def multiarranque_viajero(matriz, n_processes, limite_s=TIEMPO_MULTIARRANQUE, motor="multiarranque"):
+    """
+    Búsqueda local iterada (perturbación double-bridge + 2-opt / Or-opt) en
+    n_processes procesos con arranques aleatorios distintos, que comparten la
+    mejor ruta global en memoria compartida. Termina al agotar limite_s o
+    cuando todos los procesos se estancan. El rendimiento (it/s) queda en
+    RENDIMIENTO_MULTIARRANQUE[motor].
+    """
+    inicio = time.perf_counter()
+    recorrido, _, iteraciones = multiarranque(matriz, n_processes, limite_s)
+    mejor_ruta = cerrar_en_origen(recorrido)
+    menor_distancia = calcular_distancia_total(mejor_ruta, matriz)
+
+    fin = time.perf_counter()
+    tiempo_total = fin - inicio
+    RENDIMIENTO_MULTIARRANQUE[motor] = iteraciones / tiempo_total
+
+    print(f"🔁 Iteraciones de búsqueda local: {iteraciones} ({iteraciones / tiempo_total:.1f} it/s)")
+    print(f"🧭 Mejor ruta (Multiarranque, {n_processes} procesos):",
+          mejor_ruta if len(mejor_ruta) <= 30 else f"{len(mejor_ruta) - 1} ciudades")
+    print("Distancia mínima:", round(menor_distancia, 2))
+    print(f"⏱ Tiempo multiarranque (límite {limite_s:.1f} s): {tiempo_total:.4f} segundos\n")
+
+    return mejor_ruta, menor_distancia, tiempo_total
+
+
+# ==========================
+# PUNTO DE CONTROL
+# ==========================
+
+# Archivo donde paralelo_local guarda su progreso ("" lo desactiva)
+ARCHIVO_PUNTO_CONTROL = os.environ.get("PUNTO_CONTROL", "")
+
+
+def abrir_punto_control(ciudades, modo):
+    """Checkpoint de ARCHIVO_PUNTO_CONTROL para la instancia, o None si está desactivado."""
+    if not ARCHIVO_PUNTO_CONTROL:
+        return None
+    return Checkpoint(ARCHIVO_PUNTO_CONTROL, cities_from_points(ciudades), modo)
+
+
+# ==========================
+# SELECCIÓN DE MOTORES
+# ==========================
+
+# Cada motor recibe (ciudades, matriz, n_processes) y devuelve (ruta, distancia, tiempo)
+MOTORES = {
+    "secuencial": lambda ciudades, matriz, n_processes: secuencial_viajero(
+        matriz, generar_rutas_por_bloques(len(ciudades))),
+    "vectorizado": lambda ciudades, matriz, n_processes: secuencial_vectorizado_viajero(
+        matriz, generar_rutas_por_bloques(len(ciudades))),
+    "plano": lambda ciudades, matriz, n_processes: secuencial_plano_viajero(
+        matriz, generar_rutas_por_bloques(len(ciudades))),
+    "dfs": lambda ciudades, matriz, n_processes: secuencial_dfs_viajero(matriz),
+    "paralelo": lambda ciudades, matriz, n_processes: paralelo_viajero(
+        matriz, generar_rutas_por_bloques(len(ciudades)), n_processes),
+    "paralelo_local": lambda ciudades, matriz, n_processes: paralelo_local_viajero(
+        matriz, n_processes, abrir_punto_control(ciudades, "paralelo_local")),
+    "bb": lambda ciudades, matriz, n_processes: branch_and_bound_viajero(matriz),
+    "hk": lambda ciudades, matriz, n_processes: held_karp_viajero(matriz),
+    "hk_paralelo": lambda ciudades, matriz, n_processes: held_karp_viajero(matriz, n_processes),
+    "heuristico": lambda ciudades, matriz, n_processes: heuristico_viajero(matriz),
+    "ils": lambda ciudades, matriz, n_processes: multiarranque_viajero(matriz, 1, motor="ils"),
+    "multiarranque": lambda ciudades, matriz, n_processes: multiarranque_viajero(matriz, n_processes),
+}
+
+# Motores con resultado determinista: los únicos que se guardan en la caché
+# (heuristico, ils y multiarranque dependen del azar o de un presupuesto de tiempo)
+MOTORES_EXACTOS = {"secuencial", "vectorizado", "plano", "dfs", "paralelo", "paralelo_local", "bb", "hk", "hk_paralelo"}
+
+NOMBRES_MOTORES = {
+    "secuencial": "Secuencial",
+    "vectorizado": "Secuencial vectorizado",
+    "plano": "Secuencial plano",
+    "dfs": "Secuencial DFS",
+    "paralelo": "Paralelo",
+    "paralelo_local": "Paralelo local",
+    "bb": "Branch and Bound",
+    "hk": "Held-Karp",
+    "hk_paralelo": "Held-Karp paralelo",
+    "heuristico": "Heurístico",
+    "ils": "Búsqueda local iterada",
+    "multiarranque": "Multiarranque paralelo",
+}
+
+
 # ==========================
 # FUNCIÓN PRINCIPAL
 # ==========================
 
+def leer_argumentos():
+    """Opciones de línea de comandos; lo que no se indique se pregunta por consola."""
+    parser = argparse.ArgumentParser(description="Problema del viajero: comparación de motores")
+    parser.add_argument("--ciudades", type=int, help="número de ciudades aleatorias")
+    parser.add_argument("--semilla", type=int, help="semilla de la generación aleatoria")
+    parser.add_argument("--instancia", help="archivo TSPLIB (.tsp) o CSV con las ciudades")
+    parser.add_argument("--motores", help=f"motores separados por coma ({', '.join(MOTORES)})")
+    parser.add_argument("--sin-cache", action="store_true", help="no reutilizar resultados de motores exactos")
+    return parser.parse_args()
+
+
 def main():
     print("=== PROBLEMA DEL VIAJERO (Comparación Secuencial vs Paralelo) ===\n")
-    n = int(input("Ingrese el número de ciudades: "))
+    args = leer_argumentos()
+    # Al reanudar un punto de control se usan sus mismas ciudades
+    guardadas = load_checkpoint_cities(ARCHIVO_PUNTO_CONTROL) if ARCHIVO_PUNTO_CONTROL else None
+    ciudades = points_from_cities(guardadas) if guardadas else None
+    if ciudades:
+        print(f"Ciudades del punto de control {ARCHIVO_PUNTO_CONTROL}: {len(ciudades)}")
+    elif args.instancia:
+        ciudades = points_from_cities(load_instance(args.instancia))
+        print(f"Instancia {args.instancia}: {len(ciudades)} ciudades")
+    else:
+        n = args.ciudades if args.ciudades is not None else int(input("Ingrese el número de ciudades: "))
+        ciudades = generar_ciudades(n, semilla=args.semilla)
+    print(f"Motores disponibles: {', '.join(MOTORES)}")
+    if args.motores is not None:
+        seleccion = args.motores
+    else:
+        seleccion = input("Motores a comparar, separados por coma [secuencial,paralelo]: ").strip()
+    motores = [m.strip() for m in seleccion.split(",") if m.strip()] or ["secuencial", "paralelo"]
+    for motor in motores:
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconocido: {motor}")
 
-    ciudades = generar_ciudades(n)
     graficar_ciudades(ciudades)
-    matriz = calcular_matriz_distancias(ciudades)
-    rutas = generar_rutas(ciudades)
+    instancia = cities_from_points(ciudades)
+    matriz = cached_matrix(instancia, lambda _: calcular_matriz_distancias_np(ciudades)).tolist()
 
     # Número de procesos
     n_processes = min(6, cpu_count())  # máximo 4 o núcleos disponibles
 
-    # Ejecuciones
-    print("🚀 Ejecutando versión secuencial...")
-    mejor_ruta_seq, menor_dist_seq, tiempo_seq = secuencial_viajero(matriz, rutas)
-
-    print("🚀 Ejecutando versión paralela...")
-    mejor_ruta_par, menor_dist_par, tiempo_par = paralelo_viajero(matriz, rutas, n_processes)
-
-    # Comparación final
+    # Ejecuciones. Solo los motores exactos usan la caché (por instancia, motor y
+    # número de procesos) y de ella se toma la ruta, nunca el tiempo: un resultado
+    # en caché queda con tiempo None y fuera de las aceleraciones
+    resultados = {}
+    for motor in motores:
+        modo = f"{motor}/{n_processes}"
+        exacto = motor in MOTORES_EXACTOS
+        guardado = cached_result(instancia, modo) if exacto and not args.sin_cache else None
+        if guardado:
+            distancia, ruta = guardado
+            print(f"♻️ {NOMBRES_MOTORES[motor]}: resultado en caché (distancia {distancia:.2f})\n")
+            resultados[motor] = (ruta, distancia, None)
+            continue
+        print(f"🚀 Ejecutando versión {NOMBRES_MOTORES[motor].lower()}...")
+        resultados[motor] = MOTORES[motor](ciudades, matriz, n_processes)
+        if exacto:
+            ruta, distancia, _ = resultados[motor]
+            store_result(instancia, modo, float(distancia), [int(c) for c in ruta])
+
+    # Comparación final (la aceleración se mide respecto al primer motor ejecutado)
+    ejecutados = [motor for motor in motores if resultados[motor][2] is not None]
     print("📊 Comparación final:")
-    print(f"Secuencial: {tiempo_seq:.4f} s")
-    print(f"Paralelo ({n_processes} procesos): {tiempo_par:.4f} s")
-    print(f"Aceleración: {tiempo_seq / tiempo_par:.2f}x\n")
+    for motor in motores:
+        etiqueta = NOMBRES_MOTORES[motor]
+        if motor in ("paralelo", "paralelo_local", "hk_paralelo", "multiarranque"):
+            etiqueta += f" ({n_processes} procesos)"
+        tiempo = resultados[motor][2]
+        print(f"{etiqueta}: " + ("en caché (tiempo no medido)" if tiempo is None else f"{tiempo:.4f} s"))
+    for motor in ejecutados[1:]:
+        referencia = ejecutados[0]
+        print(f"Aceleración ({NOMBRES_MOTORES[motor]} vs {NOMBRES_MOTORES[referencia]}): "
+              f"{resultados[referencia][2] / resultados[motor][2]:.2f}x")
+    if "ils" in ejecutados and "multiarranque" in ejecutados:
+        # Con presupuesto de tiempo fijo, la aceleración útil es cuántas más iteraciones se exploran
+        print(f"Aceleración de búsqueda (Multiarranque vs Búsqueda local iterada, it/s): "
+              f"{RENDIMIENTO_MULTIARRANQUE['multiarranque'] / RENDIMIENTO_MULTIARRANQUE['ils']:.2f}x")
+        print(f"Distancia: {resultados['multiarranque'][1]:.2f} vs {resultados['ils'][1]:.2f}")
+    print()
 
     # Graficar rutas
-    graficar_ruta(ciudades, mejor_ruta_seq, tiempo_seq, tipo="Secuencial")
-    graficar_ruta(ciudades, mejor_ruta_par, tiempo_par, tipo="Paralelo")
+    for motor in motores:
+        mejor_ruta, _, tiempo = resultados[motor]
+        graficar_ruta(ciudades, mejor_ruta, tiempo, tipo=NOMBRES_MOTORES[motor])
 
 
 # ==========================
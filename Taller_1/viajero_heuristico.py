@@ -0,0 +1,297 @@
+import time
+from multiprocessing import Lock, Process, shared_memory
+from multiprocessing.sharedctypes import RawArray, RawValue
+
+import numpy as np
+
+# ==========================
+# PARÁMETROS
+# ==========================
+
+# Vecinos más cercanos considerados como puntos de inserción en Or-opt
+K_VECINOS = 10
+# Largos de segmento que Or-opt intenta mover
+LARGOS_OR_OPT = (1, 2, 3)
+# Una mejora menor que esto se considera ruido de punto flotante
+EPSILON = 1e-9
+# Multiarranque: cada cuántas iteraciones un proceso sincroniza con el mejor global
+PERIODO_SINCRONIZACION = 5
+# Multiarranque: iteraciones seguidas sin mejora tras las que un proceso se detiene
+ESTANCAMIENTO = 200
+
+
+# ==========================
+# CONSTRUCCIÓN INICIAL
+# ==========================
+
+def vecino_mas_cercano_np(M, ciudad_inicial=0):
+    """
+    Recorrido del vecino más cercano sobre la matriz NumPy M. Devuelve un
+    arreglo con las n ciudades en orden de visita (sin repetir la inicial).
+    """
+    n = len(M)
+    recorrido = np.empty(n, dtype=np.int64)
+    visitada = np.zeros(n, dtype=bool)
+    actual = ciudad_inicial
+    for paso in range(n):
+        recorrido[paso] = actual
+        visitada[actual] = True
+        if paso == n - 1:
+            break
+        fila = np.where(visitada, np.inf, M[actual])
+        actual = int(np.argmin(fila))
+    return recorrido
+
+
+def listas_vecinos(M, k=K_VECINOS):
+    """Para cada ciudad, sus k vecinas más cercanas ordenadas por distancia (n x k)."""
+    n = len(M)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64)
+    sin_diagonal = M + np.diag(np.full(n, np.inf))
+    candidatas = np.argpartition(sin_diagonal, k - 1, axis=1)[:, :k]
+    orden = np.take_along_axis(sin_diagonal, candidatas, axis=1).argsort(axis=1)
+    return np.take_along_axis(candidatas, orden, axis=1)
+
+
+def longitud_recorrido(recorrido, M):
+    """Longitud del ciclo que recorre las ciudades en orden y vuelve a la primera."""
+    return float(M[recorrido, np.roll(recorrido, -1)].sum())
+
+
+# ==========================
+# BÚSQUEDA LOCAL
+# ==========================
+
+def dos_opt(recorrido, M, limite):
+    """
+    Una pasada de 2-opt: para cada arista (a, b) evalúa de una sola vez, con
+    NumPy, el cambio de longitud de reemplazar (a, b) y (c, d) por (a, c) y
+    (b, d) para todas las aristas (c, d) posteriores, y aplica la mejor
+    invirtiendo el tramo b..c. Devuelve True si hubo alguna mejora.
+    """
+    n = len(recorrido)
+    mejoro = False
+    for i in range(n - 2):
+        if time.perf_counter() >= limite:
+            break
+        a, b = recorrido[i], recorrido[i + 1]
+        c = recorrido[i + 2:]
+        d = np.append(recorrido[i + 3:], recorrido[0])
+        if i == 0:
+            # La arista (último, primero) comparte la ciudad a con (a, b)
+            c, d = c[:-1], d[:-1]
+        if len(c) == 0:
+            continue
+        deltas = M[a, c] + M[b, d] - M[a, b] - M[c, d]
+        j = int(np.argmin(deltas))
+        if deltas[j] < -EPSILON:
+            fin = i + 2 + j
+            recorrido[i + 1:fin + 1] = recorrido[i + 1:fin + 1][::-1].copy()
+            mejoro = True
+    return mejoro
+
+
+def or_opt(recorrido, M, vecinos, limite):
+    """
+    Una pasada de Or-opt: intenta mover cada segmento de 1 a 3 ciudades,
+    en cualquiera de sus dos sentidos, junto a una de las vecinas más
+    cercanas de sus extremos. Las inserciones candidatas se evalúan en
+    bloque con NumPy. Devuelve (recorrido, True si hubo alguna mejora).
+    """
+    n = len(recorrido)
+    mejoro = False
+    for largo in LARGOS_OR_OPT:
+        if n < largo + 3:
+            continue
+        i = 0
+        while i < n:
+            if time.perf_counter() >= limite:
+                return recorrido, mejoro
+            # Segmento recorrido[i:i+largo] (con vuelta al inicio si hace falta)
+            indices = (i + np.arange(largo)) % n
+            segmento = recorrido[indices]
+            p = recorrido[(i - 1) % n]
+            q = recorrido[(i + largo) % n]
+            s0, s1 = segmento[0], segmento[-1]
+            ganancia = M[p, s0] + M[s1, q] - M[p, q]
+
+            # El resto del ciclo, empezando en q y terminando en p
+            resto = np.delete(recorrido, indices)
+            resto = np.roll(resto, -int(np.flatnonzero(resto == q)[0]))
+            posicion = np.empty(n, dtype=np.int64)
+            posicion[resto] = np.arange(len(resto))
+            en_segmento = np.zeros(n, dtype=bool)
+            en_segmento[segmento] = True
+
+            u = np.unique(np.concatenate([vecinos[s0], vecinos[s1]]))
+            u = u[~en_segmento[u]]
+            if len(u) == 0:
+                i += 1
+                continue
+            v = resto[(posicion[u] + 1) % len(resto)]
+            # Insertar entre u y v en sentido directo (u, s0..s1, v) o inverso (u, s1..s0, v)
+            directo = M[u, s0] + M[s1, v] - M[u, v]
+            inverso = M[u, s1] + M[s0, v] - M[u, v]
+            costo = np.minimum(directo, inverso)
+            mejor = int(np.argmin(costo))
+            if costo[mejor] < ganancia - EPSILON:
+                corte = int(posicion[u[mejor]]) + 1
+                insertado = segmento if directo[mejor] <= inverso[mejor] else segmento[::-1]
+                recorrido = np.concatenate([resto[:corte], insertado, resto[corte:]])
+                mejoro = True
+            else:
+                i += 1
+    return recorrido, mejoro
+
+
+def busqueda_local(M, limite_s, k_vecinos=K_VECINOS):
+    """
+    Vecino más cercano seguido de pasadas alternadas de 2-opt y Or-opt hasta
+    que ninguna mejora o se agota el tiempo límite (en segundos).
+
+    Devuelve (recorrido, longitud, historial), donde historial es la lista de
+    (segundos transcurridos, longitud, etapa) tras cada etapa, para reportar
+    calidad frente a tiempo.
+    """
+    inicio = time.perf_counter()
+    limite = inicio + limite_s
+    M = np.asarray(M, dtype=np.float64)
+
+    recorrido = vecino_mas_cercano_np(M)
+    historial = [(time.perf_counter() - inicio, longitud_recorrido(recorrido, M), "vecino más cercano")]
+    if len(M) < 4:
+        return recorrido, historial[-1][1], historial
+
+    vecinos = listas_vecinos(M, k_vecinos)
+    recorrido = mejorar(recorrido, M, vecinos, limite, historial, inicio)
+    return recorrido, historial[-1][1], historial
+
+
+def mejorar(recorrido, M, vecinos, limite, historial=None, inicio=None):
+    """
+    Alterna pasadas de 2-opt y Or-opt hasta un óptimo local o el tiempo
+    límite. Si se entrega `historial`, agrega (segundos desde `inicio`,
+    longitud, etapa) tras cada pasada.
+    """
+    while time.perf_counter() < limite:
+        mejoro_2opt = dos_opt(recorrido, M, limite)
+        if historial is not None:
+            historial.append((time.perf_counter() - inicio, longitud_recorrido(recorrido, M), "2-opt"))
+        recorrido, mejoro_or = or_opt(recorrido, M, vecinos, limite)
+        if historial is not None:
+            historial.append((time.perf_counter() - inicio, longitud_recorrido(recorrido, M), "Or-opt"))
+        if not (mejoro_2opt or mejoro_or):
+            break
+    return recorrido
+
+
+# ==========================
+# MULTIARRANQUE PARALELO (búsqueda local iterada)
+# ==========================
+
+def doble_puente(recorrido, rng):
+    """Perturbación double-bridge: parte el ciclo en A B C D y lo reordena como A C B D."""
+    a, b, c = np.sort(rng.choice(np.arange(1, len(recorrido)), size=3, replace=False))
+    return np.concatenate([recorrido[:a], recorrido[b:c], recorrido[a:b], recorrido[c:]])
+
+
+def _trabajador_multiarranque(indice, semilla, nombre_shm, n, limite_s,
+                              mejor_valor, mejor_recorrido, candado, iteraciones):
+    """
+    Proceso de búsqueda local iterada: arranca desde el vecino más cercano de
+    una ciudad aleatoria y repite perturbación + búsqueda local. Cada
+    PERIODO_SINCRONIZACION iteraciones publica su mejor ruta en la ranura
+    compartida, o adopta la global si otro proceso encontró una mejor.
+    """
+    limite = time.perf_counter() + limite_s
+    shm = shared_memory.SharedMemory(name=nombre_shm)
+    M = np.ndarray((n, n), dtype=np.float64, buffer=shm.buf)
+    rng = np.random.default_rng(semilla)
+    vecinos = listas_vecinos(M)
+
+    actual = mejorar(vecino_mas_cercano_np(M, int(rng.integers(n))), M, vecinos, limite)
+    longitud = longitud_recorrido(actual, M)
+    iteracion = 0
+    sin_mejora = 0
+
+    def sincronizar():
+        nonlocal actual, longitud
+        with candado:
+            if longitud < mejor_valor.value - EPSILON:
+                mejor_valor.value = longitud
+                mejor_recorrido[:] = actual.tolist()
+            elif mejor_valor.value < longitud - EPSILON:
+                actual = np.array(mejor_recorrido[:], dtype=np.int64)
+                longitud = mejor_valor.value
+                return True
+        return False
+
+    sincronizar()
+    while time.perf_counter() < limite and sin_mejora < ESTANCAMIENTO:
+        candidato = mejorar(doble_puente(actual, rng), M, vecinos, limite)
+        longitud_candidato = longitud_recorrido(candidato, M)
+        iteracion += 1
+        if longitud_candidato < longitud - EPSILON:
+            actual, longitud = candidato, longitud_candidato
+            sin_mejora = 0
+        else:
+            sin_mejora += 1
+        if iteracion % PERIODO_SINCRONIZACION == 0 and sincronizar():
+            sin_mejora = 0
+
+    sincronizar()
+    iteraciones[indice] = iteracion
+    del M
+    shm.close()
+
+
+def multiarranque(M, n_processes, limite_s, semilla=None):
+    """
+    Ejecuta n_processes búsquedas locales iteradas independientes que
+    comparten la mejor ruta global en memoria compartida (longitud + ruta,
+    protegidas por un candado). Cada proceso se detiene al agotar limite_s
+    o tras ESTANCAMIENTO iteraciones sin mejorar. Si algún proceso termina
+    con error se lanza RuntimeError: la ruta compartida podría no haberse
+    publicado nunca (quedaría en ceros con longitud infinita).
+
+    Devuelve (recorrido, longitud, iteraciones totales).
+    """
+    M = np.ascontiguousarray(M, dtype=np.float64)
+    n = len(M)
+    if n < 8:
+        # Con tan pocas ciudades el double-bridge no tiene sentido: basta una búsqueda local
+        recorrido, longitud, _ = busqueda_local(M, limite_s)
+        return recorrido, longitud, 0
+
+    shm = shared_memory.SharedMemory(create=True, size=M.nbytes)
+    compartida = np.ndarray(M.shape, dtype=M.dtype, buffer=shm.buf)
+    np.copyto(compartida, M)
+
+    mejor_valor = RawValue("d", float("inf"))
+    mejor_recorrido = RawArray("q", n)
+    iteraciones = RawArray("q", n_processes)
+    candado = Lock()
+    semillas = np.random.SeedSequence(semilla).spawn(n_processes)
+
+    try:
+        procesos = [
+            Process(target=_trabajador_multiarranque,
+                    args=(i, semillas[i], shm.name, n, limite_s,
+                          mejor_valor, mejor_recorrido, candado, iteraciones))
+            for i in range(n_processes)
+        ]
+        for p in procesos:
+            p.start()
+        for p in procesos:
+            p.join()
+        fallidos = [p.exitcode for p in procesos if p.exitcode != 0]
+        if fallidos:
+            raise RuntimeError(f"{len(fallidos)} de {n_processes} procesos de multiarranque fallaron (exitcode {fallidos})")
+    finally:
+        del compartida
+        shm.close()
+        shm.unlink()
+
+    return np.array(mejor_recorrido[:], dtype=np.int64), mejor_valor.value, sum(iteraciones)
@@ -0,0 +1,321 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool, cpu_count, shared_memory
+
+import numpy as np
+
+from imagenSecuencial import load_image
+from teselado import TESELAS_POR_PROCESO, elegir_tesela, repartir, teselas
+
+# ==========================
+# PARÁMETROS
+# ==========================
+
+# Backend por defecto: "secuencial", "pool" (imagen copiada a cada proceso) o "compartida"
+BACKEND_FILTROS = os.environ.get("FILTROS_BACKEND", "compartida")
+# Un kernel es separable si su segundo valor singular es menor que esta fracción del primero
+TOLERANCIA_SEPARABLE = 1e-6
+
+
+# ==========================
+# CORRELACIÓN
+# ==========================
+
+def correlacion_valida(f, kernel):
+    """
+    Correlación 2D sin relleno (como np.sum(K * region) en sobel_secuencial):
+    la salida pierde kh-1 filas y kw-1 columnas. Se suma una vista
+    desplazada por cada coeficiente no nulo, en un orden fijo.
+    """
+    kh, kw = kernel.shape
+    filas, columnas = f.shape[0] - kh + 1, f.shape[1] - kw + 1
+    salida = np.zeros((filas, columnas), dtype=np.float32)
+    for a in range(kh):
+        for b in range(kw):
+            peso = kernel[a, b]
+            if peso == 0:
+                continue
+            vista = f[a:a + filas, b:b + columnas]
+            if peso == 1:
+                salida += vista
+            elif peso == -1:
+                salida -= vista
+            else:
+                salida += peso * vista
+    return salida
+
+
+def separar(kernel, tolerancia=TOLERANCIA_SEPARABLE):
+    """
+    (columna, fila) tales que kernel = outer(columna, fila), o None si el
+    kernel no es de rango 1 según su SVD. Los factores se toman del propio
+    kernel (la fila del pivote de mayor valor absoluto y la columna dividida
+    por él) en vez de los vectores singulares, así los kernels enteros como
+    Sobel o Scharr quedan con factores exactos en float32.
+    """
+    valores = np.linalg.svd(kernel.astype(np.float64), compute_uv=False)
+    if valores[0] == 0 or (len(valores) > 1 and valores[1] > tolerancia * valores[0]):
+        return None
+    i, j = np.unravel_index(np.argmax(np.abs(kernel)), kernel.shape)
+    fila = kernel[i, :].astype(np.float32)
+    columna = (kernel[:, j] / kernel[i, j]).astype(np.float32)
+    return columna, fila
+
+
+# ==========================
+# ETAPAS
+# ==========================
+
+class Etapa:
+    """
+    Etapa de una cadena de filtros: correlación con un kernel de tamaño
+    impar. Si el kernel es separable se aplica como dos pasadas 1D
+    (kh + kw sumas por píxel en vez de kh * kw).
+
+    normalizacion indica cómo pasar a uint8 si la etapa es la última:
+    "recorte" (recorta a [0, 255]) o "maximo" (|x| / max * 255, como Sobel).
+    """
+
+    def __init__(self, kernel, nombre=None, normalizacion="recorte"):
+        self.kernel = np.asarray(kernel, dtype=np.float32)
+        if self.kernel.ndim != 2:
+            raise ValueError(f"El kernel debe ser 2D, no de {self.kernel.ndim} dimensiones {self.kernel.shape}")
+        kh, kw = self.kernel.shape
+        if kh % 2 == 0 or kw % 2 == 0:
+            raise ValueError(f"El kernel debe tener tamaño impar, no {kh}x{kw}")
+        self.radio = (kh // 2, kw // 2)
+        self.nombre = nombre or f"kernel {kh}x{kw}"
+        self.normalizacion = normalizacion
+        self.separado = separar(self.kernel)
+
+    def aplicar(self, f):
+        """Aplica la etapa a f (float32) sin relleno: devuelve la región válida."""
+        if self.separado is None:
+            return correlacion_valida(f, self.kernel)
+        columna, fila = self.separado
+        return correlacion_valida(correlacion_valida(f, columna[:, None]), fila[None, :])
+
+
+class Gradiente(Etapa):
+    """Magnitud sqrt(Gx**2 + Gy**2) de dos kernels del mismo tamaño (Sobel, Scharr)."""
+
+    def __init__(self, kx, ky, nombre=None):
+        super().__init__(kx, nombre, normalizacion="maximo")
+        self.etapa_y = Etapa(ky)
+        if self.etapa_y.radio != self.radio:
+            raise ValueError("Los kernels del gradiente deben tener el mismo tamaño")
+
+    def aplicar(self, f):
+        gx = super().aplicar(f)
+        gy = self.etapa_y.aplicar(f)
+        np.multiply(gx, gx, out=gx)
+        np.multiply(gy, gy, out=gy)
+        np.add(gx, gy, out=gx)
+        return np.sqrt(gx, out=gx)
+
+
+SOBEL_X = [[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]]
+SCHARR_X = [[-3, 0, 3], [-10, 0, 10], [-3, 0, 3]]
+BINOMIAL_5 = np.array([1, 4, 6, 4, 1], dtype=np.float32) / 16
+
+FILTROS = {
+    "desenfoque": Etapa(np.outer(BINOMIAL_5, BINOMIAL_5), "desenfoque"),
+    "nitidez": Etapa([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], "nitidez"),
+    "laplaciano": Etapa([[0, 1, 0], [1, -4, 1], [0, 1, 0]], "laplaciano", normalizacion="maximo"),
+    "sobel": Gradiente(SOBEL_X, np.transpose(SOBEL_X), "sobel"),
+    "scharr": Gradiente(SCHARR_X, np.transpose(SCHARR_X), "scharr"),
+}
+
+
+# ==========================
+# CADENA FUSIONADA POR TESELAS
+# ==========================
+
+def aplicar_tesela(img, etapas, inicio, fin, col_inicio, col_fin):
+    """
+    Aplica toda la cadena a una tesela sin pasar por la imagen completa
+    entre etapas: lee una vez la región de img con el halo acumulado de
+    todas las etapas y cada etapa recorta su radio. Los intermedios son
+    float32 (sin redondeos a uint8) y del tamaño de la tesela.
+
+    En el borde de la imagen la entrada de cada etapa se extiende
+    replicando el último píxel, igual que si la etapa se aplicara sobre la
+    imagen completa: el resultado no depende del tamaño de tesela.
+    """
+    filas, columnas = img.shape
+    halo_f = sum(etapa.radio[0] for etapa in etapas)
+    halo_c = sum(etapa.radio[1] for etapa in etapas)
+    lo_f, hi_f = max(0, inicio - halo_f), min(filas, fin + halo_f)
+    lo_c, hi_c = max(0, col_inicio - halo_c), min(columnas, col_fin + halo_c)
+    f = img[lo_f:hi_f, lo_c:hi_c].astype(np.float32)
+
+    for etapa in etapas:
+        rf, rc = etapa.radio
+        halo_f -= rf
+        halo_c -= rc
+        # Región que debe producir esta etapa: la tesela más el halo de las etapas restantes
+        sal_lo_f, sal_hi_f = max(0, inicio - halo_f), min(filas, fin + halo_f)
+        sal_lo_c, sal_hi_c = max(0, col_inicio - halo_c), min(columnas, col_fin + halo_c)
+        relleno = (
+            (lo_f - (sal_lo_f - rf), (sal_hi_f + rf) - hi_f),
+            (lo_c - (sal_lo_c - rc), (sal_hi_c + rc) - hi_c),
+        )
+        if any(relleno[0]) or any(relleno[1]):
+            f = np.pad(f, relleno, mode="edge")
+        f = etapa.aplicar(f)
+        lo_f, hi_f, lo_c, hi_c = sal_lo_f, sal_hi_f, sal_lo_c, sal_hi_c
+    return f
+
+
+def aplicar_teselas(img, etapas, salida, lista_teselas):
+    """Llena salida tesela a tesela con la cadena fusionada."""
+    for inicio, fin, col_inicio, col_fin in lista_teselas:
+        salida[inicio:fin, col_inicio:col_fin] = aplicar_tesela(img, etapas, inicio, fin, col_inicio, col_fin)
+
+
+def aplicar_sin_fusion(img, etapas):
+    """Referencia: cada etapa sobre la imagen completa (float32), una tras otra."""
+    return aplicar_tesela(img, etapas, 0, img.shape[0], 0, img.shape[1])
+
+
+def a_uint8(resultado, normalizacion):
+    """Única conversión a uint8 de la cadena, al final."""
+    if normalizacion == "maximo":
+        resultado = np.abs(resultado)
+        maximo = resultado.max()
+        return ((resultado / maximo) * 255).astype(np.uint8) if maximo > 0 else resultado.astype(np.uint8)
+    return np.clip(np.rint(resultado), 0, 255).astype(np.uint8)
+
+
+# ==========================
+# BACKENDS
+# ==========================
+
+def cadena_secuencial(img, etapas, n_processes=1, tesela=None):
+    """Cadena fusionada por teselas en un solo proceso."""
+    salida = np.empty(img.shape, dtype=np.float32)
+    aplicar_teselas(img, etapas, salida, teselas(img.shape, *(tesela or elegir_tesela(img, 1))))
+    return salida
+
+
+# Imagen de cada proceso del backend "pool" (se copia una vez por proceso, no por tarea)
+_img_proceso = None
+
+
+def _iniciar_proceso(img):
+    global _img_proceso
+    _img_proceso = img
+
+
+def _worker_pool(etapas, lista_teselas):
+    """Devuelve [(tesela, resultado)] de un tramo de teselas."""
+    return [(t, aplicar_tesela(_img_proceso, etapas, *t)) for t in lista_teselas]
+
+
+def cadena_pool(img, etapas, n_processes=None, tesela=None):
+    """
+    Como sobel_paralelo: la imagen se copia a los procesos y los
+    resultados vuelven serializados y se cosen en el proceso principal.
+    """
+    n_processes = n_processes or min(4, cpu_count())
+    tramos = repartir(teselas(img.shape, *(tesela or elegir_tesela(img, n_processes))),
+                      TESELAS_POR_PROCESO * n_processes)
+    salida = np.empty(img.shape, dtype=np.float32)
+    with Pool(processes=n_processes, initializer=_iniciar_proceso, initargs=(img,)) as pool:
+        for resultados in pool.starmap(_worker_pool, [(etapas, tramo) for tramo in tramos]):
+            for (inicio, fin, col_inicio, col_fin), bloque in resultados:
+                salida[inicio:fin, col_inicio:col_fin] = bloque
+    return salida
+
+
+def _worker_compartido(etapas, shm_entrada, shm_salida, shape, lista_teselas):
+    """Escribe un tramo de teselas directo en la salida compartida."""
+    entrada = shared_memory.SharedMemory(name=shm_entrada)
+    salida = shared_memory.SharedMemory(name=shm_salida)
+    img = np.ndarray(shape, dtype=np.uint8, buffer=entrada.buf)
+    resultado = np.ndarray(shape, dtype=np.float32, buffer=salida.buf)
+    aplicar_teselas(img, etapas, resultado, lista_teselas)
+    del img, resultado
+    entrada.close()
+    salida.close()
+
+
+def cadena_compartida(img, etapas, n_processes=None, tesela=None):
+    """Como sobel_paralelo_teselado: entrada y salida en memoria compartida, sin copias."""
+    n_processes = n_processes or min(4, cpu_count())
+    tramos = repartir(teselas(img.shape, *(tesela or elegir_tesela(img, n_processes))),
+                      TESELAS_POR_PROCESO * n_processes)
+    shm_entrada = shared_memory.SharedMemory(create=True, size=img.nbytes)
+    shm_salida = shared_memory.SharedMemory(create=True, size=img.size * np.dtype(np.float32).itemsize)
+    try:
+        entrada = np.ndarray(img.shape, dtype=np.uint8, buffer=shm_entrada.buf)
+        np.copyto(entrada, img)
+        resultado = np.ndarray(img.shape, dtype=np.float32, buffer=shm_salida.buf)
+        with Pool(processes=n_processes) as pool:
+            pool.starmap(
+                _worker_compartido,
+                [(etapas, shm_entrada.name, shm_salida.name, img.shape, tramo) for tramo in tramos],
+            )
+        salida = resultado.copy()
+        del entrada, resultado
+    finally:
+        for shm in (shm_entrada, shm_salida):
+            shm.close()
+            shm.unlink()
+    return salida
+
+
+BACKENDS = {
+    "secuencial": cadena_secuencial,
+    "pool": cadena_pool,
+    "compartida": cadena_compartida,
+}
+
+
+def filtrar(img, etapas, backend=BACKEND_FILTROS, n_processes=None, tesela=None):
+    """
+    Aplica la cadena de etapas (objetos Etapa o nombres de FILTROS) y
+    devuelve (imagen uint8, tiempo), como sobel_paralelo.
+    """
+    etapas = [FILTROS[e] if isinstance(e, str) else e for e in etapas]
+    if not etapas:
+        raise ValueError("La cadena de filtros debe tener al menos una etapa")
+    if backend == "secuencial":
+        n_processes = 1
+    n_processes = n_processes or min(4, cpu_count())
+    tesela = tesela or elegir_tesela(img, n_processes)  # el autoajuste queda fuera de la medición
+    inicio = time.perf_counter()
+    resultado = BACKENDS[backend](img, etapas, n_processes, tesela)
+    final = a_uint8(resultado, etapas[-1].normalizacion)
+    return final, time.perf_counter() - inicio
+
+
+# ==========================
+# PROGRAMA PRINCIPAL
+# ==========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cadena de filtros por convolución")
+    parser.add_argument("imagen")
+    parser.add_argument("--etapas", default="desenfoque,sobel",
+                        help=f"filtros separados por comas: {', '.join(FILTROS)}")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_FILTROS)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--salida", help="archivo PNG donde guardar el resultado")
+    args = parser.parse_args()
+
+    img = load_image(args.imagen)
+    etapas = [FILTROS[nombre.strip()] for nombre in args.etapas.split(",") if nombre.strip()]
+    for etapa in etapas:
+        tipo = "separable (2 pasadas 1D)" if etapa.separado is not None else "2D"
+        print(f"   {etapa.nombre}: {etapa.kernel.shape[0]}x{etapa.kernel.shape[1]}, {tipo}")
+
+    resultado, tiempo = filtrar(img, etapas, args.backend, args.procesos)
+    if args.backend != "secuencial":
+        print(f"🧩 Tesela {'x'.join(map(str, elegir_tesela(img, args.procesos or min(4, cpu_count()))))}")
+    print(f"⏱ Cadena {args.etapas} ({args.backend}): {tiempo:.4f} s ({img.size / 1e6 / tiempo:.1f} MP/s)")
+
+    if args.salida:
+        import cv2
+        cv2.imwrite(args.salida, resultado)
@@ -1,9 +1,20 @@
+import os
+import sys
 import cv2
 import numpy as np
 import time
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Pool, Process, cpu_count, shared_memory
 import matplotlib.pyplot as plt
 
+from imagenSecuencial import magnitud_sobel, magnitud_sobel_en
+from teselado import elegir_tesela, sobel_paralelo_teselado
+
+# Motor de Sobel de cada bloque: "bucle" (píxel a píxel) o "vectorizado" (desplazamientos NumPy)
+MOTOR_SOBEL = os.environ.get("SOBEL_MOTOR", "vectorizado")
+# Reparto: "pool" (bloques copiados por pool.map), "compartida" (bandas sobre memoria compartida)
+# o "teselas" (teselas 2D autoajustadas sobre memoria compartida)
+MODO_PARALELO = os.environ.get("SOBEL_PARALELO", "compartida")
+
 # ==========================
 # FUNCIONES AUXILIARES
 # ==========================
@@ -33,7 +44,19 @@ def sobel_worker(args):
     return bloque_resultado
 
 
-def sobel_paralelo(img, n_processes=None):
+def sobel_worker_vectorizado(args):
+    """Igual que sobel_worker, pero con la convolución vectorizada (resultado idéntico)."""
+    bloque, _, _ = args
+    return magnitud_sobel(bloque)
+
+
+WORKERS_SOBEL = {
+    "bucle": sobel_worker,
+    "vectorizado": sobel_worker_vectorizado,
+}
+
+
+def sobel_paralelo(img, n_processes=None, motor=MOTOR_SOBEL):
     """Aplica el filtro Sobel en paralelo dividiendo la imagen en bloques horizontales."""
     if n_processes is None:
         n_processes = min(4, cpu_count())
@@ -61,7 +84,7 @@ def sobel_paralelo(img, n_processes=None):
     inicio_tiempo = time.perf_counter()
 
     with Pool(processes=n_processes) as pool:
-        resultados = pool.map(sobel_worker, bloques)
+        resultados = pool.map(WORKERS_SOBEL[motor], bloques)
 
     fin_tiempo = time.perf_counter()
 
@@ -89,18 +112,99 @@ def sobel_paralelo(img, n_processes=None):
     return resultado_final, tiempo_total
 
 
+# ==========================
+# PARALELO SOBRE MEMORIA COMPARTIDA
+# ==========================
+
+def sobel_worker_compartido(shm_entrada, shm_salida, shape, inicio, fin):
+    """
+    Calcula las filas [inicio, fin) leyendo la imagen de entrada (con una fila
+    de halo por lado) y las escribe directo en la salida compartida.
+    """
+    entrada = shared_memory.SharedMemory(name=shm_entrada)
+    salida = shared_memory.SharedMemory(name=shm_salida)
+    img = np.ndarray(shape, dtype=np.uint8, buffer=entrada.buf)
+    resultado = np.ndarray(shape, dtype=np.float32, buffer=salida.buf)
+    magnitud_sobel_en(img, resultado, inicio, fin)
+    del img, resultado
+    entrada.close()
+    salida.close()
+
+
+def sobel_paralelo_compartido(img, n_processes=None):
+    """
+    Sobel en paralelo sin copiar bloques entre procesos: la imagen y la
+    salida float32 viven en memoria compartida, cada proceso recibe solo los
+    nombres y su intervalo de filas, y escribe su banda en el lugar. Evita
+    serializar la imagen de ida y el resultado de vuelta, y el cosido final.
+    Si algún proceso termina con error se lanza RuntimeError en vez de
+    devolver una imagen con bandas sin calcular.
+    """
+    if n_processes is None:
+        n_processes = min(4, cpu_count())
+
+    inicio_tiempo = time.perf_counter()
+    filas, columnas = img.shape
+    shm_entrada = shared_memory.SharedMemory(create=True, size=img.nbytes)
+    shm_salida = shared_memory.SharedMemory(create=True, size=img.size * np.dtype(np.float32).itemsize)
+    try:
+        entrada = np.ndarray(img.shape, dtype=np.uint8, buffer=shm_entrada.buf)
+        np.copyto(entrada, img)
+        resultado = np.ndarray(img.shape, dtype=np.float32, buffer=shm_salida.buf)
+
+        paso = filas // n_processes
+        procesos = []
+        for i in range(n_processes):
+            inicio = i * paso
+            fin = (i + 1) * paso if i < n_processes - 1 else filas
+            procesos.append(Process(
+                target=sobel_worker_compartido,
+                args=(shm_entrada.name, shm_salida.name, img.shape, inicio, fin),
+            ))
+        for p in procesos:
+            p.start()
+        for p in procesos:
+            p.join()
+        fallidos = [p.exitcode for p in procesos if p.exitcode != 0]
+        if fallidos:
+            raise RuntimeError(f"{len(fallidos)} de {n_processes} procesos Sobel fallaron (exitcode {fallidos})")
+
+        # Normalizar (misma expresión que la versión secuencial)
+        resultado_final = ((resultado / resultado.max()) * 255).astype(np.uint8)
+        del entrada, resultado
+    finally:
+        for shm in (shm_entrada, shm_salida):
+            shm.close()
+            shm.unlink()
+
+    fin_tiempo = time.perf_counter()
+    return resultado_final, fin_tiempo - inicio_tiempo
+
+
+MODOS_PARALELOS = {
+    "pool": sobel_paralelo,
+    "compartida": sobel_paralelo_compartido,
+    "teselas": sobel_paralelo_teselado,
+}
+
+
 # ==========================
 # PROGRAMA PRINCIPAL
 # ==========================
 
 if __name__ == "__main__":
-    img_path = "C:/Users/ADMIN/TrabajosHPC/Imagenes/brocoli1.png"  # cambia a tu imagen
+    img_path = sys.argv[1] if len(sys.argv) > 1 else "C:/Users/ADMIN/TrabajosHPC/Imagenes/brocoli1.png"  # cambia a tu imagen
 
     img = load_image(img_path)
 
-    print("🚀 Ejecutando Sobel en paralelo...")
-    sobel_img, tiempo_par = sobel_paralelo(img, n_processes=4)
+    # SOBEL_MOTOR solo aplica al modo pool; los demás calculan siempre la versión vectorizada
+    detalle = f", motor {MOTOR_SOBEL}" if MODO_PARALELO == "pool" else ""
+    print(f"🚀 Ejecutando Sobel en paralelo (modo {MODO_PARALELO}{detalle})...")
+    sobel_img, tiempo_par = MODOS_PARALELOS[MODO_PARALELO](img, n_processes=4)
     print(f"⏱ Tiempo paralelo (4 procesos): {tiempo_par:.4f} segundos")
+    if MODO_PARALELO == "teselas":
+        alto, ancho = elegir_tesela(img, 4)
+        print(f"🧩 Tesela {alto}x{ancho}: {img.size / 1e6 / tiempo_par:.1f} MP/s")
 
     # Visualizar resultado
     plt.figure(figsize=(10, 5))
@@ -1,8 +1,13 @@
+import os
+import sys
 import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 import time
 
+# Motor de Sobel: "bucle" (convolución píxel a píxel) o "vectorizado" (desplazamientos NumPy)
+MOTOR_SOBEL = os.environ.get("SOBEL_MOTOR", "vectorizado")
+
 # -----------------------------
 # 1. Cargar imagen
 # -----------------------------
@@ -37,20 +42,85 @@ def sobel_secuencial(img):
     bordeada = (bordeada / bordeada.max()) * 255
     return bordeada.astype(np.uint8)
 
+# -----------------------------
+# 2b. Sobel vectorizado (desplazamientos de la imagen completa)
+# -----------------------------
+def magnitud_sobel(img):
+    """
+    Magnitud del gradiente Sobel (float32, borde de 1 píxel en cero) sin
+    bucles por píxel: Kx y Ky son separables ([1,2,1] x [-1,0,1]), así que
+    cada uno se obtiene con dos pasadas de sumas de vistas desplazadas.
+
+    Todos los valores intermedios son enteros menores que 2**24, exactos en
+    float32, y la raíz es la misma operación IEEE que en sobel_secuencial:
+    el resultado es idéntico bit a bit.
+    """
+    bordeada = np.empty(img.shape, dtype=np.float32)
+    magnitud_sobel_en(img, bordeada)
+    return bordeada
+
+
+def magnitud_sobel_en(img, salida, inicio=0, fin=None, col_inicio=0, col_fin=None):
+    """
+    Escribe en salida[inicio:fin, col_inicio:col_fin] esa región de
+    magnitud_sobel(img), leyendo solo la región de img que necesita (un
+    píxel de halo por lado). Permite que varios procesos llenen bandas o
+    teselas de una misma salida compartida.
+    """
+    filas, columnas = img.shape
+    fin = filas if fin is None else fin
+    col_fin = columnas if col_fin is None else col_fin
+    # Filas y columnas con vecinas a ambos lados; las del borde de la imagen quedan en cero
+    a, b = max(inicio, 1), min(fin, filas - 1)
+    c, d = max(col_inicio, 1), min(col_fin, columnas - 1)
+    if b <= a or d <= c:
+        salida[inicio:fin, col_inicio:col_fin] = 0
+        return
+    salida[inicio:a, col_inicio:col_fin] = 0
+    salida[b:fin, col_inicio:col_fin] = 0
+    salida[a:b, col_inicio:c] = 0
+    salida[a:b, d:col_fin] = 0
+
+    f = img[a - 1:b + 1, c - 1:d + 1].astype(np.float32)
+    # Pasada vertical: suavizado [1,2,1] (para Gx) y diferencia [-1,0,1] (para Gy)
+    suave = f[:-2] + 2 * f[1:-1] + f[2:]
+    diferencia = f[2:] - f[:-2]
+    # Pasada horizontal: diferencia sobre el suavizado, suavizado sobre la diferencia
+    Gx = suave[:, 2:] - suave[:, :-2]
+    Gy = diferencia[:, :-2] + 2 * diferencia[:, 1:-1] + diferencia[:, 2:]
+
+    np.multiply(Gx, Gx, out=Gx)
+    np.multiply(Gy, Gy, out=Gy)
+    np.add(Gx, Gy, out=Gx)
+    np.sqrt(Gx, out=salida[a:b, c:d])
+
+
+def sobel_vectorizado(img):
+    """Mismo resultado que sobel_secuencial, con la convolución vectorizada."""
+    bordeada = magnitud_sobel(img)
+    bordeada = (bordeada / bordeada.max()) * 255
+    return bordeada.astype(np.uint8)
+
+
+MOTORES_SOBEL = {
+    "bucle": sobel_secuencial,
+    "vectorizado": sobel_vectorizado,
+}
+
 # -----------------------------
 # 3. Programa principal
 # -----------------------------
 if __name__ == "__main__":
-    img_path = "C:/Users/ADMIN/TrabajosHPC/Imagenes/brocoli1.png"
+    img_path = sys.argv[1] if len(sys.argv) > 1 else "C:/Users/ADMIN/TrabajosHPC/Imagenes/brocoli1.png"
 
     img = load_image(img_path)
 
     inicio = time.time()
-    sobel_img = sobel_secuencial(img)
+    sobel_img = MOTORES_SOBEL[MOTOR_SOBEL](img)
     fin = time.time()
 
     tiempo = fin - inicio
-    print(f"Tiempo de ejecución (secuencial): {tiempo:.4f} segundos")
+    print(f"Tiempo de ejecución (secuencial, motor {MOTOR_SOBEL}): {tiempo:.4f} segundos")
 
     # Crear ventana
     fig = plt.figure(figsize=(10,5))
@@ -66,7 +136,7 @@ if __name__ == "__main__":
     # Imagen Sobel con tiempo incrustado
     plt.subplot(1,2,2)
     plt.imshow(sobel_img, cmap='gray')
-    plt.title("Sobel Secuencial")
+    plt.title(f"Sobel Secuencial ({MOTOR_SOBEL})")
     plt.axis("off")
 
     # Texto dentro de la imagen
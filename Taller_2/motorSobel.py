@@ -0,0 +1,201 @@
+import argparse
+import glob
+import os
+import time
+from multiprocessing import Pool, cpu_count, resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from imagenSecuencial import sobel_vectorizado
+from teselado import TESELAS_POR_PROCESO, elegir_tesela, magnitud_teselas, repartir, teselas
+
+# ==========================
+# PARÁMETROS
+# ==========================
+
+EXTENSIONES = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+
+# ==========================
+# FUNCIONES DE LOS PROCESOS
+# ==========================
+
+# Segmentos compartidos adjuntados por cada proceso: {"entrada": (nombre, shm), "salida": ...}
+_adjuntos = {}
+
+
+def _adjuntar(rol, nombre):
+    """Adjunta (una sola vez por nombre) el segmento compartido de un rol."""
+    actual = _adjuntos.get(rol)
+    if actual is None or actual[0] != nombre:
+        if actual is not None:
+            actual[1].close()  # el motor creció sus búferes: soltar el anterior
+        _adjuntos[rol] = (nombre, shared_memory.SharedMemory(name=nombre))
+    return _adjuntos[rol][1]
+
+
+def _teselas_compartidas(nombre_entrada, nombre_salida, shape, lista_teselas):
+    """Filtra un tramo de teselas de la imagen publicada por el motor, en el lugar."""
+    entrada = _adjuntar("entrada", nombre_entrada)
+    salida = _adjuntar("salida", nombre_salida)
+    n = shape[0] * shape[1]
+    img = np.ndarray(n, dtype=np.uint8, buffer=entrada.buf).reshape(shape)
+    resultado = np.ndarray(n, dtype=np.float32, buffer=salida.buf).reshape(shape)
+    magnitud_teselas(img, resultado, lista_teselas)
+
+
+def _procesar_archivo(tarea):
+    """
+    Etapas completas de una imagen dentro de un proceso: decodificar,
+    filtrar y codificar. Con carpeta de salida escribe el PNG y devuelve su
+    ruta; si no, devuelve la imagen filtrada.
+    """
+    ruta, carpeta_salida = tarea
+    img = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise FileNotFoundError(f"No se pudo cargar la imagen desde: {ruta}")
+    bordes = sobel_vectorizado(img)
+    if carpeta_salida is None:
+        return ruta, bordes, img.size
+    destino = os.path.join(carpeta_salida, os.path.splitext(os.path.basename(ruta))[0] + "_sobel.png")
+    cv2.imwrite(destino, bordes)
+    return ruta, destino, img.size
+
+
+# ==========================
+# MOTOR PERSISTENTE
+# ==========================
+
+class SobelEngine:
+    """
+    Motor Sobel con un Pool que se crea una vez y se reutiliza entre llamadas.
+
+    - procesar(img): una imagen grande repartida por teselas 2D entre los
+      procesos (tamaño autoajustado por forma de imagen, ver teselado.py);
+      la imagen y la salida viven en búferes compartidos que solo se
+      recrean si llega una imagen más grande.
+    - procesar_lote(rutas) / procesar_carpeta(carpeta): muchas imágenes, una
+      por tarea; cada proceso decodifica, filtra y codifica la suya, así las
+      tres etapas de imágenes distintas avanzan a la vez.
+
+    Uso:
+        with SobelEngine(4) as motor:
+            bordes = motor.procesar(img)
+            estadisticas = motor.procesar_carpeta("Imagenes", "salida")
+    """
+
+    def __init__(self, n_processes=None):
+        self.n_processes = n_processes or min(4, cpu_count())
+        self.pool = None
+        self.tesela = None  # (alto, ancho) usada en la última llamada a procesar
+        self.entrada = None
+        self.salida = None
+
+    def __enter__(self):
+        # Los procesos heredan el rastreador de recursos del padre; si cada uno
+        # arrancara el suyo, al terminar borraría los búferes compartidos vigentes.
+        # Solo en POSIX: en Windows la memoria compartida no pasa por el rastreador
+        if os.name == "posix":
+            resource_tracker.ensure_running()
+        self.pool = Pool(processes=self.n_processes)
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.close()
+        self.pool.join()
+        for shm in (self.entrada, self.salida):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.entrada = self.salida = None
+
+    def _reservar(self, n_pixeles):
+        """Crea (o agranda) los búferes compartidos para n_pixeles."""
+        if self.entrada is not None and self.entrada.size >= n_pixeles:
+            return
+        for shm in (self.entrada, self.salida):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.entrada = shared_memory.SharedMemory(create=True, size=n_pixeles)
+        self.salida = shared_memory.SharedMemory(create=True, size=4 * n_pixeles)
+
+    def procesar(self, img, tesela=None):
+        """Sobel de una imagen, repartido por tramos de teselas entre los procesos del pool."""
+        self._reservar(img.size)
+        entrada = np.ndarray(img.size, dtype=np.uint8, buffer=self.entrada.buf).reshape(img.shape)
+        resultado = np.ndarray(img.size, dtype=np.float32, buffer=self.salida.buf).reshape(img.shape)
+        np.copyto(entrada, img)
+
+        self.tesela = tesela or elegir_tesela(img, self.n_processes)
+        tramos = repartir(teselas(img.shape, *self.tesela), TESELAS_POR_PROCESO * self.n_processes)
+        self.pool.starmap(
+            _teselas_compartidas,
+            [(self.entrada.name, self.salida.name, img.shape, tramo) for tramo in tramos],
+        )
+
+        bordes = ((resultado / resultado.max()) * 255).astype(np.uint8)
+        del entrada, resultado
+        return bordes
+
+    def procesar_lote(self, rutas, carpeta_salida=None):
+        """
+        Procesa una lista de archivos. Devuelve un diccionario con los
+        resultados ({ruta: ruta de salida o imagen}) y el rendimiento
+        (imágenes/s y megapíxeles/s).
+        """
+        if carpeta_salida is not None:
+            os.makedirs(carpeta_salida, exist_ok=True)
+        inicio = time.perf_counter()
+        resultados = {}
+        pixeles = 0
+        tareas = [(ruta, carpeta_salida) for ruta in rutas]
+        for ruta, salida, n in self.pool.imap_unordered(_procesar_archivo, tareas):
+            resultados[ruta] = salida
+            pixeles += n
+        segundos = time.perf_counter() - inicio
+        return {
+            "resultados": resultados,
+            "imagenes": len(rutas),
+            "segundos": segundos,
+            "imagenes_por_s": len(rutas) / segundos if segundos > 0 else 0.0,
+            "megapixeles_por_s": pixeles / 1e6 / segundos if segundos > 0 else 0.0,
+        }
+
+    def procesar_carpeta(self, carpeta, carpeta_salida=None):
+        """procesar_lote sobre todas las imágenes de una carpeta."""
+        rutas = sorted(
+            ruta for ruta in glob.glob(os.path.join(carpeta, "*"))
+            if ruta.lower().endswith(EXTENSIONES)
+        )
+        return self.procesar_lote(rutas, carpeta_salida)
+
+
+# ==========================
+# PROGRAMA PRINCIPAL
+# ==========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sobel por lotes con un pool persistente")
+    parser.add_argument("entradas", nargs="+", help="carpetas o archivos de imagen")
+    parser.add_argument("--salida", help="carpeta donde escribir los resultados (PNG)")
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+
+    rutas = []
+    for entrada in args.entradas:
+        if os.path.isdir(entrada):
+            rutas += sorted(
+                os.path.join(entrada, f) for f in os.listdir(entrada) if f.lower().endswith(EXTENSIONES)
+            )
+        else:
+            rutas.append(entrada)
+
+    with SobelEngine(args.procesos) as motor:
+        print(f"🚀 Procesando {len(rutas)} imágenes con {motor.n_processes} procesos...")
+        estadisticas = motor.procesar_lote(rutas, args.salida)
+
+    print(f"⏱ Tiempo total: {estadisticas['segundos']:.4f} segundos")
+    print(f"📈 Rendimiento: {estadisticas['imagenes_por_s']:.2f} imágenes/s "
+          f"({estadisticas['megapixeles_por_s']:.1f} MP/s)")
@@ -0,0 +1,223 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool, cpu_count, shared_memory
+
+import numpy as np
+
+from imagenSecuencial import load_image, magnitud_sobel_en, sobel_vectorizado
+
+# ==========================
+# PARÁMETROS
+# ==========================
+
+# Píxeles de vecindad que necesita cada lado de una tesela (Sobel 3x3 → 1)
+HALO = 1
+# Tesela fija "ALTOxANCHO" (p. ej. "256x1024"); vacío = autoajuste
+TESELA = os.environ.get("SOBEL_TESELA", "")
+# Tamaños que prueba el autoajuste
+ALTOS_CANDIDATOS = (32, 64, 128, 256, 512)
+ANCHOS_CANDIDATOS = (256, 512, 1024, 2048, 4096)
+# Teselas mínimas por proceso para que el reparto quede equilibrado
+TESELAS_POR_PROCESO = 4
+# Filas de la imagen sobre las que se mide cada candidato
+FILAS_MUESTRA = 1024
+
+# Teselas elegidas por el autoajuste: {(filas, columnas, n_processes): (alto, ancho)}
+_teselas_elegidas = {}
+
+
+# ==========================
+# TESELAS
+# ==========================
+
+def leer_tesela(texto):
+    """Convierte "ALTOxANCHO" en (alto, ancho)."""
+    alto, ancho = texto.lower().split("x")
+    return int(alto), int(ancho)
+
+
+def teselas(shape, alto, ancho):
+    """
+    Teselas (inicio, fin, col_inicio, col_fin) que cubren la imagen, en orden
+    de filas: teselas consecutivas comparten halo y quedan cerca en memoria.
+    """
+    filas, columnas = shape
+    return [
+        (i, min(i + alto, filas), j, min(j + ancho, columnas))
+        for i in range(0, filas, alto)
+        for j in range(0, columnas, ancho)
+    ]
+
+
+def repartir(lista, n_grupos):
+    """Divide la lista en n_grupos tramos contiguos de tamaño casi igual."""
+    n_grupos = max(1, min(n_grupos, len(lista)))
+    cortes = np.linspace(0, len(lista), n_grupos + 1).astype(int)
+    return [lista[cortes[k]:cortes[k + 1]] for k in range(n_grupos)]
+
+
+def magnitud_teselas(img, salida, lista_teselas):
+    """Calcula la magnitud Sobel tesela a tesela; cada tesela lee solo su región + HALO."""
+    for inicio, fin, col_inicio, col_fin in lista_teselas:
+        magnitud_sobel_en(img, salida, inicio, fin, col_inicio, col_fin)
+
+
+def sobel_teselado(img, alto, ancho):
+    """
+    Mismo resultado que sobel_vectorizado, pero recorriendo la imagen por
+    teselas: los temporales float32 de cada tesela caben en caché en vez de
+    ocupar varias veces la imagen completa.
+    """
+    bordeada = np.empty(img.shape, dtype=np.float32)
+    magnitud_teselas(img, bordeada, teselas(img.shape, alto, ancho))
+    bordeada = (bordeada / bordeada.max()) * 255
+    return bordeada.astype(np.uint8)
+
+
+# ==========================
+# AUTOAJUSTE
+# ==========================
+
+def candidatos(shape, n_processes):
+    """
+    Tamaños de tesela a probar: los anchos se recortan al de la imagen y se
+    descartan los que dejan menos de TESELAS_POR_PROCESO teselas por proceso
+    (si ninguno cumple, se queda el que más teselas genera).
+    """
+    filas, columnas = shape
+    opciones = sorted({
+        (min(alto, filas), min(ancho, columnas))
+        for alto in ALTOS_CANDIDATOS
+        for ancho in ANCHOS_CANDIDATOS
+    })
+    minimo = TESELAS_POR_PROCESO * n_processes if n_processes > 1 else 1
+    validas = [t for t in opciones if len(teselas(shape, *t)) >= minimo]
+    if validas:
+        return validas
+    return [min(opciones, key=lambda t: t[0] * t[1])]
+
+
+def medir_teselas(img, n_processes, repeticiones=3):
+    """
+    Tiempo por megapíxel de cada candidato, medido en un proceso sobre una
+    muestra de la imagen (FILAS_MUESTRA filas, ancho completo: el ancho es lo
+    que decide la localidad). Devuelve [(alto, ancho, MP/s)] de mejor a peor.
+    """
+    muestra = img[:FILAS_MUESTRA]
+    salida = np.empty(muestra.shape, dtype=np.float32)
+    magnitud_teselas(muestra, salida, teselas(muestra.shape, *muestra.shape))  # calentamiento
+    resultados = []
+    for alto, ancho in candidatos(img.shape, n_processes):
+        lista = teselas(muestra.shape, alto, ancho)
+        mejor = float("inf")
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            magnitud_teselas(muestra, salida, lista)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        resultados.append((alto, ancho, muestra.size / 1e6 / mejor))
+    return sorted(resultados, key=lambda r: -r[2])
+
+
+def elegir_tesela(img, n_processes=1):
+    """
+    Tesela (alto, ancho) para esta forma de imagen y número de procesos:
+    SOBEL_TESELA si está definida y, si no, la más rápida según
+    medir_teselas. El resultado se recuerda por (forma, procesos).
+    """
+    if TESELA:
+        return leer_tesela(TESELA)
+    clave = (*img.shape, n_processes)
+    if clave not in _teselas_elegidas:
+        alto, ancho, _ = medir_teselas(img, n_processes)[0]
+        _teselas_elegidas[clave] = (alto, ancho)
+    return _teselas_elegidas[clave]
+
+
+# ==========================
+# PARALELO POR TESELAS
+# ==========================
+
+def sobel_worker_teselas(shm_entrada, shm_salida, shape, lista_teselas):
+    """Calcula un tramo de teselas sobre la imagen y la salida compartidas."""
+    entrada = shared_memory.SharedMemory(name=shm_entrada)
+    salida = shared_memory.SharedMemory(name=shm_salida)
+    img = np.ndarray(shape, dtype=np.uint8, buffer=entrada.buf)
+    resultado = np.ndarray(shape, dtype=np.float32, buffer=salida.buf)
+    magnitud_teselas(img, resultado, lista_teselas)
+    del img, resultado
+    entrada.close()
+    salida.close()
+
+
+def sobel_paralelo_teselado(img, n_processes=None, tesela=None):
+    """
+    Sobel en paralelo por teselas 2D sobre memoria compartida. Las teselas
+    se reparten en tramos contiguos (TESELAS_POR_PROCESO por proceso), así
+    el paralelismo no queda limitado por el número de filas y cada proceso
+    trabaja sobre regiones que caben en caché. tesela=None usa elegir_tesela.
+    """
+    if n_processes is None:
+        n_processes = min(4, cpu_count())
+    alto, ancho = tesela or elegir_tesela(img, n_processes)
+
+    inicio_tiempo = time.perf_counter()
+    shm_entrada = shared_memory.SharedMemory(create=True, size=img.nbytes)
+    shm_salida = shared_memory.SharedMemory(create=True, size=img.size * np.dtype(np.float32).itemsize)
+    try:
+        entrada = np.ndarray(img.shape, dtype=np.uint8, buffer=shm_entrada.buf)
+        np.copyto(entrada, img)
+        resultado = np.ndarray(img.shape, dtype=np.float32, buffer=shm_salida.buf)
+
+        tramos = repartir(teselas(img.shape, alto, ancho), TESELAS_POR_PROCESO * n_processes)
+        with Pool(processes=n_processes) as pool:
+            pool.starmap(
+                sobel_worker_teselas,
+                [(shm_entrada.name, shm_salida.name, img.shape, tramo) for tramo in tramos],
+            )
+
+        resultado_final = ((resultado / resultado.max()) * 255).astype(np.uint8)
+        del entrada, resultado
+    finally:
+        for shm in (shm_entrada, shm_salida):
+            shm.close()
+            shm.unlink()
+
+    fin_tiempo = time.perf_counter()
+    return resultado_final, fin_tiempo - inicio_tiempo
+
+
+# ==========================
+# PROGRAMA PRINCIPAL
+# ==========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autoajuste de teselas para Sobel")
+    parser.add_argument("imagen")
+    parser.add_argument("--procesos", type=int, default=min(4, cpu_count()))
+    args = parser.parse_args()
+
+    img = load_image(args.imagen)
+    print(f"🔎 Imagen {img.shape[0]}x{img.shape[1]}, {args.procesos} procesos")
+    mediciones = medir_teselas(img, args.procesos)
+    for alto, ancho, mps in mediciones[:5]:
+        print(f"   tesela {alto}x{ancho}: {mps:.1f} MP/s")
+    _teselas_elegidas[(*img.shape, args.procesos)] = mediciones[0][:2]
+
+    inicio = time.perf_counter()
+    referencia = sobel_vectorizado(img)
+    t_vectorizado = time.perf_counter() - inicio
+
+    tesela = elegir_tesela(img, args.procesos)
+    inicio = time.perf_counter()
+    secuencial = sobel_teselado(img, *tesela)
+    t_teselado = time.perf_counter() - inicio
+
+    paralelo, t_paralelo = sobel_paralelo_teselado(img, args.procesos, tesela)
+
+    mp = img.size / 1e6
+    print(f"🧩 Tesela elegida: {tesela[0]}x{tesela[1]} ({len(teselas(img.shape, *tesela))} teselas)")
+    print(f"⏱ Vectorizado sin teselas: {t_vectorizado:.4f} s ({mp / t_vectorizado:.1f} MP/s)")
+    print(f"⏱ Secuencial por teselas: {t_teselado:.4f} s ({mp / t_teselado:.1f} MP/s)")
+    print(f"⏱ Paralelo por teselas ({args.procesos} procesos): {t_paralelo:.4f} s ({mp / t_paralelo:.1f} MP/s)")
+    print("✅ Resultados idénticos:", np.array_equal(referencia, secuencial) and np.array_equal(referencia, paralelo))
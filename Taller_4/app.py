@@ -8,13 +8,48 @@ Este servicio expone un endpoint POST /calculate_distance
 que recibe una lista ordenada de ciudades con coordenadas
 cartesianas y devuelve la distancia total recorrida
 (usando distancia euclidiana entre puntos consecutivos).
+
+El endpoint POST /calculate_distances evalúa en una sola
+petición muchas rutas codificadas como índices sobre una
+tabla de ciudades enviada una única vez.
+
+El endpoint POST /search_range recibe un intervalo de rangos
+canónicos de permutaciones (un solo sentido de cada ruta), las
+genera localmente y devuelve la mejor ruta del intervalo.
+
+Las matrices de distancias y los resultados de /search_range se
+conservan en memoria (LRU) por instancia, así las peticiones repetidas
+sobre las mismas ciudades no recalculan nada.
 """
 from flask import Flask, request, jsonify
+from collections import OrderedDict
+from functools import lru_cache
 import math
+import threading
+
+import numpy as np
+
+from geometry import city_coordinates, distance_matrix
+from permutation_rank import canonical_count, unrank_canonical_batch
 
 # Inicialización de la aplicación
 app = Flask(__name__)
 
+# Rutas evaluadas por pasada vectorizada en /search_range (acota la memoria)
+RANGE_BLOCK = 50_000
+# Mayor n cuyo n! cabe en int64
+MAX_RANGE_CITIES = 20
+# Rutas máximas por petición a /search_range (~3 s por núcleo): un intervalo
+# mayor ocuparía el único worker de gunicorn indefinidamente
+MAX_RANGE_WIDTH = 2_000_000
+# Memoria máxima (bytes) de las matrices de distancias conservadas entre peticiones
+MATRIX_CACHE_BYTES = 256 * 2**20
+# Con más ciudades /calculate_distances no construye la matriz n x n (8 MB con 1024):
+# calcula cada arista de las rutas recibidas, con memoria proporcional a la petición
+MATRIX_MAX_CITIES = 1024
+# Resultados de /search_range conservados (misma instancia, intervalo y tipo de ruta)
+RANGE_CACHE_SIZE = 4096
+
 
 # =========================================
 # 1. Funciones auxiliares de cálculo
@@ -68,6 +103,216 @@ def total_route_distance(cities):
     return total
 
 
+def validate_cities(cities):
+    """
+    Valida la lista de ciudades recibida y convierte sus coordenadas
+    a float en el mismo lugar.
+
+    Parameters
+    ----------
+    cities : object
+        Valor del campo "cities" del cuerpo JSON.
+
+    Returns
+    -------
+    str or None
+        Mensaje de error si la lista no es válida, None en caso contrario.
+    """
+    if not isinstance(cities, list) or len(cities) == 0:
+        return "'cities' must be a non-empty list"
+
+    # Validamos que cada ciudad tenga x e y numéricos
+    for idx, city in enumerate(cities):
+        if not isinstance(city, dict):
+            return f"City at index {idx} must be an object"
+
+        if "x" not in city or "y" not in city:
+            return f"City at index {idx} must have 'x' and 'y'"
+
+        try:
+            city["x"] = float(city["x"])
+            city["y"] = float(city["y"])
+        except (ValueError, TypeError):
+            return f"'x' and 'y' for city at index {idx} must be numeric"
+
+    return None
+
+
+# =========================================
+# 2. Evaluación vectorizada de rutas por lotes
+# =========================================
+def coordinates_key(cities):
+    """
+    Clave hashable de una instancia: tupla de coordenadas (x, y) en orden.
+    Dos peticiones con las mismas ciudades comparten matriz y resultados.
+    """
+    return tuple((city["x"], city["y"]) for city in cities)
+
+
+# Matrices por instancia, de la menos a la más recientemente usada
+_matrix_cache = OrderedDict()
+_matrix_cache_bytes = 0
+_matrix_cache_lock = threading.Lock()
+
+
+def cached_distance_matrix(coords_key):
+    """
+    distance_matrix de la instancia, calculada una vez por réplica y
+    reutilizada por las peticiones siguientes con las mismas ciudades.
+    La caché descarta las matrices menos usadas cuando su tamaño total
+    supera MATRIX_CACHE_BYTES (una matriz más grande no se guarda).
+    """
+    global _matrix_cache_bytes
+    with _matrix_cache_lock:
+        dist = _matrix_cache.get(coords_key)
+        if dist is not None:
+            _matrix_cache.move_to_end(coords_key)
+            return dist
+
+    dist = distance_matrix(np.array(coords_key, dtype=np.float64).reshape(-1, 2))
+    dist.setflags(write=False)  # compartida entre peticiones
+    if dist.nbytes > MATRIX_CACHE_BYTES:
+        return dist
+
+    with _matrix_cache_lock:
+        if coords_key not in _matrix_cache:
+            _matrix_cache[coords_key] = dist
+            _matrix_cache_bytes += dist.nbytes
+            while _matrix_cache_bytes > MATRIX_CACHE_BYTES:
+                _, evicted = _matrix_cache.popitem(last=False)
+                _matrix_cache_bytes -= evicted.nbytes
+    return dist
+
+
+def edge_route_distances(coords, routes):
+    """
+    Distancia de k rutas calculando cada arista con np.hypot sobre las
+    coordenadas de sus extremos, sin matriz n x n (memoria O(k x m)).
+    """
+    points = coords[routes]
+    steps = points[:, 1:, :] - points[:, :-1, :]
+    return np.hypot(steps[..., 0], steps[..., 1]).sum(axis=1)
+
+
+def batch_route_distances(dist, routes):
+    """
+    Calcula en una sola pasada vectorizada la distancia de k rutas.
+
+    Parameters
+    ----------
+    dist : numpy.ndarray
+        Matriz (n x n) de distancias entre ciudades.
+    routes : numpy.ndarray
+        Arreglo entero (k x m) donde cada fila es una ruta expresada
+        como índices sobre las ciudades.
+
+    Returns
+    -------
+    numpy.ndarray
+        Arreglo de k distancias totales (abiertas, sin regreso al origen).
+    """
+    # Cada arista (routes[:, i], routes[:, i+1]) se toma de la matriz: no hay
+    # raíces cuadradas por ruta, solo una suma por fila
+    return dist[routes[:, :-1], routes[:, 1:]].sum(axis=1)
+
+
+def parse_routes(routes, num_cities):
+    """
+    Valida y convierte la lista de rutas codificadas por índices.
+
+    Parameters
+    ----------
+    routes : object
+        Valor del campo "routes" del cuerpo JSON.
+    num_cities : int
+        Tamaño de la tabla de ciudades.
+
+    Returns
+    -------
+    tuple[numpy.ndarray or None, str or None]
+        (rutas como arreglo k x m, mensaje de error).
+    """
+    if not isinstance(routes, list) or len(routes) == 0:
+        return None, "'routes' must be a non-empty list"
+
+    # np.array(..., dtype=int64) truncaría 1.9 a 1 y aceptaría true/false:
+    # solo se admiten enteros JSON
+    for route in routes:
+        if not isinstance(route, list) or not all(type(index) is int for index in route):
+            return None, "'routes' must be lists of integer indices with the same length"
+
+    try:
+        array = np.array(routes, dtype=np.int64)
+    except (ValueError, TypeError, OverflowError):
+        return None, "'routes' must be lists of integer indices with the same length"
+
+    if array.ndim != 2:
+        return None, "'routes' must be lists of integer indices with the same length"
+
+    if array.size and (array.min() < 0 or array.max() >= num_cities):
+        return None, f"Route indices must be in the range [0, {num_cities})"
+
+    return array, None
+
+
+def best_in_rank_range(dist, start_rank, end_rank, closed=False, block=RANGE_BLOCK):
+    """
+    Recorre las permutaciones con rango canónico en [start_rank, end_rank)
+    en bloques de a lo sumo `block` rutas y devuelve la mejor del intervalo.
+    Los rangos canónicos numeran un solo sentido de cada ruta (primer
+    elemento menor que el último), así que no se genera ninguna ruta invertida.
+
+    Parameters
+    ----------
+    dist : numpy.ndarray
+        Matriz (n x n) de distancias entre ciudades.
+    start_rank, end_rank : int
+        Intervalo semiabierto de rangos canónicos (ver permutation_rank).
+    closed : bool
+        Si es True, los rangos numeran las permutaciones de las ciudades
+        1..n-1 y cada ruta sale de la ciudad 0 y vuelve a ella.
+    block : int
+        Número de rutas generadas y evaluadas por pasada.
+
+    Returns
+    -------
+    tuple[float, int, list[int], int]
+        (mejor distancia, rango de la mejor ruta, mejor ruta como índices,
+        rutas evaluadas).
+    """
+    n = dist.shape[0]
+    free = n - 1 if closed else n
+    best_distance = math.inf
+    best_rank = start_rank
+    best_route = None
+    evaluated = 0
+
+    for low in range(start_rank, end_rank, block):
+        high = min(low + block, end_rank)
+        ranks = np.arange(low, high, dtype=np.int64)
+        perms = unrank_canonical_batch(ranks, free)
+        if closed:
+            origin = np.zeros((len(perms), 1), dtype=np.int64)
+            routes = np.hstack([origin, perms + 1, origin])
+        else:
+            routes = perms
+        distances = batch_route_distances(dist, routes)
+        evaluated += len(routes)
+        idx = int(np.argmin(distances))
+        if distances[idx] < best_distance:
+            best_distance = float(distances[idx])
+            best_rank = int(ranks[idx])
+            best_route = routes[idx].tolist()
+
+    return best_distance, best_rank, best_route, evaluated
+
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def cached_best_in_rank_range(coords_key, start_rank, end_rank, closed):
+    """best_in_rank_range con memoria: repetir un intervalo ya resuelto es inmediato."""
+    return best_in_rank_range(cached_distance_matrix(coords_key), start_rank, end_rank, closed)
+
+
 # =========================================
 # 4. Endpoint principal: /calculate_distance
 # =========================================
@@ -104,22 +349,9 @@ def calculate_distance():
 
     cities = data["cities"]
 
-    if not isinstance(cities, list) or len(cities) == 0:
-        return jsonify({"error": "'cities' must be a non-empty list"}), 400
-
-    # Validamos que cada ciudad tenga x e y numéricos
-    for idx, city in enumerate(cities):
-        if not isinstance(city, dict):
-            return jsonify({"error": f"City at index {idx} must be an object"}), 400
-
-        if "x" not in city or "y" not in city:
-            return jsonify({"error": f"City at index {idx} must have 'x' and 'y'"}), 400
-
-        try:
-            city["x"] = float(city["x"])
-            city["y"] = float(city["y"])
-        except (ValueError, TypeError):
-            return jsonify({"error": f"'x' and 'y' for city at index {idx} must be numeric"}), 400
+    error = validate_cities(cities)
+    if error:
+        return jsonify({"error": error}), 400
 
     # -----------------------------
     # 4.2. Cálculo de la distancia
@@ -131,6 +363,153 @@ def calculate_distance():
     # -----------------------------
     return jsonify({"total_distance": total}), 200
 
+
+# =========================================
+# Endpoint por lotes: /calculate_distances
+# =========================================
+@app.route("/calculate_distances", methods=["POST"])
+def calculate_distances():
+    """
+    Endpoint que recibe la tabla de ciudades una sola vez y muchas
+    rutas codificadas como índices, y las evalúa en una sola pasada.
+
+    Formato esperado del cuerpo (JSON):
+    {
+        "cities": [
+            { "id": "A", "x": 0.0, "y": 0.0 },
+            ...
+        ],
+        "routes": [[0, 1, 2], [0, 2, 1], ...],
+        "best_only": false
+    }
+
+    Respuesta (JSON) con "best_only" en false:
+    {
+        "distances": [<float>, ...]
+    }
+
+    Respuesta (JSON) con "best_only" en true:
+    {
+        "best_index": <int>,
+        "best_route": ["A", "C", "B"],
+        "best_distance": <float>,
+        "routes_evaluated": <int>
+    }
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "JSON body is required"}), 400
+
+    for field in ("cities", "routes"):
+        if field not in data:
+            return jsonify({"error": f"Field '{field}' is required"}), 400
+
+    cities = data["cities"]
+    error = validate_cities(cities)
+    if error:
+        return jsonify({"error": error}), 400
+
+    routes, error = parse_routes(data["routes"], len(cities))
+    if error:
+        return jsonify({"error": error}), 400
+
+    if len(cities) > MATRIX_MAX_CITIES:
+        distances = edge_route_distances(city_coordinates(cities), routes)
+    else:
+        distances = batch_route_distances(cached_distance_matrix(coordinates_key(cities)), routes)
+
+    if not data.get("best_only", False):
+        return jsonify({"distances": distances.tolist()}), 200
+
+    best = int(np.argmin(distances))
+    return jsonify(
+        {
+            "best_index": best,
+            "best_route": [cities[i].get("id", i) for i in routes[best].tolist()],
+            "best_distance": float(distances[best]),
+            "routes_evaluated": int(routes.shape[0]),
+        }
+    ), 200
+
+# =========================================
+# Endpoint de búsqueda por rangos: /search_range
+# =========================================
+@app.route("/search_range", methods=["POST"])
+def search_range():
+    """
+    Endpoint que busca la mejor ruta entre las permutaciones cuyo rango
+    canónico está en [start_rank, end_rank), generándolas en el servidor.
+    Los rangos canónicos (0 .. n!/2) numeran un solo sentido de cada ruta.
+    Con "closed" en true los rangos numeran las permutaciones de las
+    ciudades 1..n-1 y la ruta vuelve a la ciudad 0.
+
+    Formato esperado del cuerpo (JSON):
+    {
+        "cities": [
+            { "id": "A", "x": 0.0, "y": 0.0 },
+            ...
+        ],
+        "start_rank": 0,
+        "end_rank": 5040,
+        "closed": false
+    }
+
+    Respuesta (JSON):
+    {
+        "best_rank": <int>,
+        "best_route": ["A", "C", "B", ...],
+        "best_distance": <float>,
+        "routes_evaluated": <int>
+    }
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "JSON body is required"}), 400
+
+    for field in ("cities", "start_rank", "end_rank"):
+        if field not in data:
+            return jsonify({"error": f"Field '{field}' is required"}), 400
+
+    cities = data["cities"]
+    error = validate_cities(cities)
+    if error:
+        return jsonify({"error": error}), 400
+
+    if len(cities) > MAX_RANGE_CITIES:
+        return jsonify({"error": f"At most {MAX_RANGE_CITIES} cities are supported"}), 400
+
+    closed = data.get("closed", False)
+    if not isinstance(closed, bool):
+        return jsonify({"error": "'closed' must be a boolean"}), 400
+
+    start_rank = data["start_rank"]
+    end_rank = data["end_rank"]
+    total = canonical_count(len(cities) - 1 if closed else len(cities))
+    if not all(isinstance(value, int) and not isinstance(value, bool)
+               for value in (start_rank, end_rank)):
+        return jsonify({"error": "'start_rank' and 'end_rank' must be integers"}), 400
+
+    if not 0 <= start_rank < end_rank <= total:
+        return jsonify({"error": f"Rank range must satisfy 0 <= start_rank < end_rank <= {total}"}), 400
+
+    if end_rank - start_rank > MAX_RANGE_WIDTH:
+        return jsonify({"error": f"At most {MAX_RANGE_WIDTH} ranks per request are supported"}), 400
+
+    best_distance, best_rank, best_route, evaluated = cached_best_in_rank_range(
+        coordinates_key(cities), start_rank, end_rank, closed
+    )
+
+    return jsonify(
+        {
+            "best_rank": best_rank,
+            "best_route": [cities[i].get("id", i) for i in best_route],
+            "best_distance": best_distance,
+            "routes_evaluated": evaluated,
+        }
+    ), 200
+
 # =========================================
 # Endpoint de healthcheck
 # =========================================
@@ -0,0 +1,124 @@
+"""
+Compara el costo de la reducción final de find_best_path según cómo se
+recupera la mejor ruta:
+
+- "islice": la estrategia original de recuperación, que vuelve a recorrer
+  generate_paths desde el inicio con itertools.islice cada vez que aparece
+  un nuevo mínimo. Aquí recorre las rutas canónicas cerradas actuales
+  ((n-1)!/2), no las n! rutas de la versión original, así que mide el
+  costo de esa estrategia y no el comportamiento original completo.
+- "rango": la versión actual, que guarda solo el rango canónico de la mejor
+  ruta y la reconstruye una vez con rank_to_path (unrank_canonical).
+
+Las distancias se calculan localmente (sin la API) para aislar la reducción.
+El costo de "islice" crece con el número de mejoras encontradas ("Mejoras"),
+que depende del orden en que llegan los resultados.
+"""
+import itertools
+import math
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+import matplotlib.pyplot as plt
+
+from bruteForce import generate_paths, generate_random_cities, generate_ranked_paths, rank_to_path
+
+CITY_COUNTS = range(3, 10)
+
+
+def route_distances(cities: List[dict]) -> Tuple[List[int], List[float]]:
+    """Rangos y distancias de todas las rutas en el orden de generate_ranked_paths."""
+    city_map = {city["id"]: (city["x"], city["y"]) for city in cities}
+    ranks, distances = [], []
+    for rank, path in generate_ranked_paths(cities):
+        ranks.append(rank)
+        distances.append(sum(math.dist(city_map[a], city_map[b]) for a, b in zip(path, path[1:])))
+    return ranks, distances
+
+
+def reduce_with_islice(
+    ranks: Sequence[int], distances: Sequence[float], cities: List[dict]
+) -> Tuple[float, tuple]:
+    best_distance, best_path = float("inf"), None
+    for i, distance in enumerate(distances):
+        if distance < best_distance:
+            best_distance = distance
+            best_path = list(itertools.islice(generate_paths(cities), i, i + 1))[0]
+    return best_distance, best_path
+
+
+def reduce_with_rank(
+    ranks: Sequence[int], distances: Sequence[float], cities: List[dict]
+) -> Tuple[float, tuple]:
+    best_distance, best_rank = float("inf"), None
+    for rank, distance in zip(ranks, distances):
+        if distance < best_distance:
+            best_distance = distance
+            best_rank = rank
+    return best_distance, rank_to_path(best_rank, cities)
+
+
+def count_improvements(distances: Sequence[float]) -> int:
+    best, improvements = float("inf"), 0
+    for distance in distances:
+        if distance < best:
+            best, improvements = distance, improvements + 1
+    return improvements
+
+
+def time_reduction(
+    reduce: Callable[[Sequence[int], Sequence[float], List[dict]], Tuple[float, tuple]],
+    ranks: Sequence[int],
+    distances: Sequence[float],
+    cities: List[dict],
+) -> Tuple[float, Tuple[float, tuple]]:
+    started = time.perf_counter()
+    result = reduce(ranks, distances, cities)
+    return time.perf_counter() - started, result
+
+
+def plot_reduction_times(counts, islice_times, rank_times, out_path: Path) -> None:
+    plt.figure(figsize=(8, 5))
+    plt.plot(counts, islice_times, marker="o", label="islice (rutas canónicas)")
+    plt.plot(counts, rank_times, marker="o", label="rango + unrank")
+    plt.yscale("log")
+    plt.xlabel("Número de ciudades")
+    plt.ylabel("Tiempo de reducción (s)")
+    plt.title("Recuperación de la mejor ruta: islice vs rango")
+    plt.grid(True, alpha=0.3)
+    plt.legend()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=200)
+    plt.close()
+
+
+def main() -> None:
+    counts, islice_times, rank_times = [], [], []
+
+    print(f"{'Ciudades':>10} | {'Rutas':>10} | {'Mejoras':>8} | {'islice (s)':>11} | {'rango (s)':>10}")
+    print("-" * 62)
+    for n in CITY_COUNTS:
+        cities = generate_random_cities(n)
+        ranks, distances = route_distances(cities)
+        islice_s, islice_result = time_reduction(reduce_with_islice, ranks, distances, cities)
+        rank_s, rank_result = time_reduction(reduce_with_rank, ranks, distances, cities)
+        assert islice_result == rank_result
+
+        counts.append(n)
+        islice_times.append(islice_s)
+        rank_times.append(rank_s)
+        print(
+            f"{n:10d} | {len(distances):10d} | {count_improvements(distances):8d} | "
+            f"{islice_s:11.6f} | {rank_s:10.6f}"
+        )
+
+    plot_reduction_times(
+        counts, islice_times, rank_times,
+        Path(__file__).parent / "metrics" / "reduction_comparison.png",
+    )
+
+
+if __name__ == "__main__":
+    main()
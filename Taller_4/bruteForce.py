@@ -1,6 +1,7 @@
 import csv
 import itertools
 import logging
+import math
 import os
 import random
 import time
@@ -8,6 +9,11 @@ from pathlib import Path
 import aiohttp
 import asyncio
 
+from permutation_rank import canonical_count, unrank_canonical
+from tsp_comun.checkpoint import Checkpoint, load_checkpoint_cities
+from tsp_comun.enumeracion import permutaciones_canonicas
+from tsp_comun.instances import cached_result, load_instance, store_result
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -17,19 +23,62 @@ CALCULATOR_URL = os.environ.get(
     "CALCULATOR_URL",
     "http://localhost:5000/calculate_distance",
 )
+BATCH_URL = os.environ.get(
+    "BATCH_URL",
+    CALCULATOR_URL.rsplit("/", 1)[0] + "/calculate_distances",
+)
+RANGE_URL = os.environ.get(
+    "RANGE_URL",
+    CALCULATOR_URL.rsplit("/", 1)[0] + "/search_range",
+)
+# "path": una petición por ruta; "batch": BATCH_SIZE rutas por petición;
+# "range": RANGE_CHUNKS intervalos de rangos generados en el servidor;
+# "concurrency": modo "path" repetido con cada valor de CONCURRENCY_LEVELS
+SEARCH_MODE = os.environ.get("SEARCH_MODE", "path")
+BATCH_SIZE = int(os.environ.get("BATCH_SIZE", "5000"))
+# Varios intervalos por réplica para repartir la carga del Swarm
+RANGE_CHUNKS = int(os.environ.get("RANGE_CHUNKS", "16"))
+# Rutas máximas por intervalo: la API rechaza los mayores (app.MAX_RANGE_WIDTH)
+MAX_RANGE_WIDTH = int(os.environ.get("MAX_RANGE_WIDTH", "2000000"))
+# Peticiones en vuelo simultáneas en el modo "path"
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "64"))
+# Lotes en vuelo simultáneos en el modo "batch" (cada uno ocupa una réplica un buen rato)
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+KEEPALIVE_TIMEOUT_S = 30
+# "concurrency": mide el modo "path" con cada uno de estos niveles
+CONCURRENCY_LEVELS = (1, 8, 32, 64, 128, 256)
+# 1: ciclos que salen de la primera ciudad y vuelven a ella (el TSP); 0: rutas abiertas
+CLOSED_TOURS = os.environ.get("CLOSED_TOURS", "1") == "1"
+# Modo "range": archivo de checkpoint para reanudar la búsqueda ("" lo desactiva)
+CHECKPOINT_FILE = os.environ.get("CHECKPOINT_FILE", "")
+# Instancia: archivo TSPLIB/CSV ("" genera ciudades aleatorias) y semilla de la generación
+CITIES_FILE = os.environ.get("CITIES_FILE", "")
+CITIES_SEED = int(os.environ["CITIES_SEED"]) if os.environ.get("CITIES_SEED") else None
+# 1: reutiliza el resultado guardado para la misma instancia y modo (ver instances.py)
+USE_CACHE = os.environ.get("USE_CACHE", "1") == "1"
 SECUENCIAL = 0
 NUM_CITIES = 9
 METRICS_CSV = Path("metrics_cluster.csv")
+# Columnas del CSV de métricas; analyze_metrics/benchmark_reduction leen las cuatro primeras
+METRICS_FIELDS = [
+    "num_cities",
+    "paths_processed",
+    "best_distance",
+    "duration_s",
+    "concurrency",
+    "paths_per_s",
+]
 NUMBER_OF_RUNS = 1
 
 # =========================================
 # 1. Datos de Entrada: Lista de Ciudades
 # =========================================
-def generate_random_cities(num_cities):
+def generate_random_cities(num_cities, seed=None):
     """
     Genera num_cities ciudades con coordenadas aleatorias en el plano [0,100]x[0,100].
+    Con la misma semilla se obtienen siempre las mismas ciudades.
     """
-    rng = random.Random()
+    rng = random.Random(seed)
     cities_local = []
     for idx in range(num_cities):
         city_id = f"C{idx + 1}"
@@ -45,12 +94,44 @@ def generate_random_cities(num_cities):
 # =========================================
 # 2. Generación de Rutas: Permutaciones de Ciudades
 # =========================================
-def generate_paths(cities):
+def generate_ranked_paths(cities, closed=None):
     """
-    Crea todas las permutaciones posibles de ciudades y las devuelve como un iterable.
+    Genera pares (rango, ruta) de un solo sentido de cada ruta: una ruta y
+    su reverso miden lo mismo, así que las permutaciones de las ciudades
+    libres se generan ya canónicas (primera menor que la última, ver
+    tsp_comun.enumeracion.permutaciones_canonicas, en orden de rango
+    canónico) sin producir las invertidas.
+
+    Con closed=True (por defecto) la primera ciudad queda fija como origen y
+    destino y se permutan las demás: (n-1)!/2 ciclos. Con closed=False se
+    permutan todas las ciudades: n!/2 rutas abiertas. El rango es el rango
+    canónico de la permutación de las ciudades libres.
     """
+    if closed is None:
+        closed = CLOSED_TOURS
     city_ids = [city["id"] for city in cities]
-    return itertools.permutations(city_ids)
+    free_ids = city_ids[1:] if closed else city_ids
+    for rank, perm in enumerate(permutaciones_canonicas(range(len(free_ids)))):
+        path = tuple(free_ids[i] for i in perm)
+        yield rank, (city_ids[0], *path, city_ids[0]) if closed else path
+
+def generate_paths(cities, closed=None):
+    """
+    Crea las rutas posibles de ciudades (un sentido de cada una) y las devuelve como un iterable.
+    """
+    return (path for _, path in generate_ranked_paths(cities, closed))
+
+def rank_to_path(rank, cities, closed=None):
+    """
+    Devuelve la ruta (ids de ciudad) que generate_ranked_paths asocia al
+    rango `rank`, sin recorrer las permutaciones anteriores.
+    """
+    if closed is None:
+        closed = CLOSED_TOURS
+    city_ids = [city["id"] for city in cities]
+    free_ids = city_ids[1:] if closed else city_ids
+    path = tuple(free_ids[i] for i in unrank_canonical(rank, len(free_ids)))
+    return (city_ids[0], *path, city_ids[0]) if closed else path
 
 # =========================================
 # 3. Cálculo de Distancia Asíncrono: Solicitud a la API
@@ -82,66 +163,304 @@ async def calculate_distance(session, path, city_map):
             return result["total_distance"]
         response.raise_for_status()
 
+async def calculate_best_in_batch(session, routes, cities_payload):
+    """
+    Envía un lote de rutas codificadas como índices al endpoint
+    /calculate_distances y devuelve (mejor_distancia, mejor_ruta) del lote.
+    """
+    payload = {
+        "cities": cities_payload,
+        "routes": routes,
+        "best_only": True,
+    }
+    async with session.post(BATCH_URL, json=payload) as response:
+        if response.status == 200:
+            result = await response.json()
+            return result["best_distance"], result["best_route"]
+        response.raise_for_status()
+
+
+def generate_index_batches(num_cities, batch_size, closed=None):
+    """
+    Recorre las rutas de generate_ranked_paths codificadas como índices
+    0..num_cities-1, en lotes de a lo sumo batch_size rutas (listas de listas).
+    """
+    if closed is None:
+        closed = CLOSED_TOURS
+    cities = [{"id": i} for i in range(num_cities)]
+    routes = generate_paths(cities, closed)
+    while True:
+        batch = [list(route) for route in itertools.islice(routes, batch_size)]
+        if not batch:
+            return
+        yield batch
+
+async def search_rank_range(session, start_rank, end_rank, cities_payload):
+    """
+    Pide al endpoint /search_range la mejor ruta entre las permutaciones
+    con rango en [start_rank, end_rank) y devuelve (distancia, ruta,
+    rutas evaluadas).
+    """
+    payload = {
+        "cities": cities_payload,
+        "start_rank": start_rank,
+        "end_rank": end_rank,
+        "closed": CLOSED_TOURS,
+    }
+    async with session.post(RANGE_URL, json=payload) as response:
+        if response.status == 200:
+            result = await response.json()
+            return result["best_distance"], result["best_route"], result["routes_evaluated"]
+        response.raise_for_status()
+
+
+def split_rank_range(total, chunks):
+    """
+    Divide [0, total) en a lo sumo `chunks` intervalos contiguos de tamaño
+    casi igual, devueltos como tuplas (start_rank, end_rank).
+    """
+    chunks = max(1, min(chunks, total))
+    size, extra = divmod(total, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
 # =========================================
 # 4. Función para Grabar Métricas en CSV
 # =========================================
+def metrics_path():
+    """
+    Archivo donde anexar métricas: METRICS_CSV si no existe o si su cabecera
+    coincide con METRICS_FIELDS. Un archivo con otro esquema (p. ej. el de
+    cuatro columnas anterior) no se toca y las filas nuevas van a
+    "<nombre>_v2.csv", para no desalinear sus columnas.
+    """
+    if not METRICS_CSV.exists():
+        return METRICS_CSV
+    with METRICS_CSV.open(newline="") as csvfile:
+        header = next(csv.reader(csvfile), None)
+    if header is None or header == METRICS_FIELDS:
+        return METRICS_CSV
+    versioned = METRICS_CSV.with_name(f"{METRICS_CSV.stem}_v2{METRICS_CSV.suffix}")
+    logging.warning(
+        "%s tiene otras columnas (%s): las métricas se guardan en %s",
+        METRICS_CSV, ",".join(header), versioned,
+    )
+    return versioned
+
+
 def append_metrics_row(row):
     """
-    Registra métricas en un archivo CSV, creando el archivo si no existe.
+    Registra métricas en un archivo CSV, creando el archivo (con cabecera)
+    si no existe o está vacío.
     """
-    METRICS_CSV.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = [
-        "num_cities",
-        "paths_processed",
-        "best_distance",
-        "duration_s",
-    ]
-    exists = METRICS_CSV.exists()
-    with METRICS_CSV.open("a", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        if not exists:
+    path = metrics_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    needs_header = not path.exists() or path.stat().st_size == 0
+    with path.open("a", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=METRICS_FIELDS, restval="")
+        if needs_header:
             writer.writeheader()
         writer.writerow(row)
 
 # =========================================
 # 5. Optimización de la Ruta: Encontrar la Mejor Ruta
 # =========================================
-async def find_best_path(cities):
+async def consume_concurrently(items, handle, concurrency):
+    """
+    Procesa `items` con `concurrency` trabajadores que consumen el mismo
+    iterador: cada elemento se envía una vez con `await handle(session, item)`,
+    nunca hay más de `concurrency` peticiones en vuelo y los elementos se
+    generan a medida que se envían, así la memoria no crece con n!.
+    """
+    items = iter(items)
+
+    async def worker(session):
+        for item in items:
+            await handle(session, item)
+
+    # Conexiones limitadas y reutilizadas (keep-alive) hacia el ingress del Swarm
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        limit_per_host=concurrency,
+        keepalive_timeout=KEEPALIVE_TIMEOUT_S,
+    )
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+
+
+async def find_best_path(cities, concurrency=CONCURRENCY):
     """
     Función asíncrona que encuentra la mejor ruta entre las ciudades utilizando múltiples tareas en paralelo.
+
+    Las rutas se toman de forma perezosa de generate_paths: solo `concurrency`
+    trabajadores mantienen una petición en vuelo cada uno y reducen al mejor
+    resultado a medida que llegan, así la memoria no crece con n!.
     """
     best_path = None
+    best_rank = None
     best_distance = float('inf')  # Inicializamos con una distancia infinita
     total_paths = 0
     started = time.perf_counter()
 
-    # Generamos las rutas (permutaciones)
-    paths = generate_paths(cities)
+    # Generamos las rutas (permutaciones) sin materializarlas, junto con su
+    # rango lexicográfico para reconstruir la ganadora al final
+    paths = generate_ranked_paths(cities)
     city_map = {city["id"]: city for city in cities}
 
-    # Inicia una sesión asíncrona para las solicitudes HTTP
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for path in paths:
-            # Para cada ruta, creamos una tarea asíncrona para calcular la distancia
-            tasks.append(calculate_distance(session, path, city_map))
+    async def evaluate(session, ranked_path):
+        nonlocal best_rank, best_distance, total_paths
+        rank, path = ranked_path
+        distance = await calculate_distance(session, path, city_map)
+        total_paths += 1
+        if distance < best_distance:
+            best_distance = distance
+            best_rank = rank
+
+    await consume_concurrently(paths, evaluate, concurrency)
+
+    if best_rank is not None:
+        # La ruta ganadora se reconstruye una sola vez a partir de su rango
+        best_path = rank_to_path(best_rank, cities)
+
+    elapsed = time.perf_counter() - started
+    throughput = total_paths / elapsed if elapsed > 0 else 0.0
+    if best_path:
+        logging.info("La mejor ruta es: %s", " -> ".join(best_path))
+        logging.info("Con una distancia total de: %.4f unidades", best_distance)
+        logging.info("Tiempo: %.4f (%d en vuelo, %.1f rutas/s)", elapsed, concurrency, throughput)
+    else:
+        logging.error("No se pudo encontrar una ruta válida.")
+
+    append_metrics_row(
+        {
+            "num_cities": len(cities),
+            "paths_processed": total_paths,
+            "best_distance": best_distance if best_path else "",
+            "duration_s": round(elapsed, 4),
+            "concurrency": concurrency,
+            "paths_per_s": round(throughput, 1),
+        }
+    )
+    return best_distance, best_path
+
+
+async def measure_concurrency(cities, levels=CONCURRENCY_LEVELS):
+    """
+    Ejecuta find_best_path con cada nivel de concurrencia sobre las mismas
+    ciudades; el rendimiento (rutas/s) de cada nivel queda en el CSV.
+    """
+    for level in levels:
+        await find_best_path(cities, concurrency=level)
+
+
+async def find_best_path_batched(cities, batch_size=BATCH_SIZE, concurrency=BATCH_CONCURRENCY):
+    """
+    Variante por lotes de find_best_path: la tabla de ciudades viaja una vez
+    por lote y cada petición evalúa batch_size rutas en el servidor. Como
+    en find_best_path, los lotes se generan a medida que se envían y solo
+    `concurrency` están en vuelo a la vez.
+    """
+    best_path = None
+    best_distance = float('inf')
+    total_paths = 0
+    requests_sent = 0
+    started = time.perf_counter()
+
+    cities_payload = [
+        {"id": city["id"], "x": city["x"], "y": city["y"]} for city in cities
+    ]
+
+    async def evaluate(session, batch):
+        nonlocal best_path, best_distance, total_paths, requests_sent
+        # Cada resultado ya es el mejor de su lote: solo se reduce un valor por petición
+        distance, path = await calculate_best_in_batch(session, batch, cities_payload)
+        total_paths += len(batch)
+        requests_sent += 1
+        if distance < best_distance:
+            best_distance = distance
+            best_path = path
 
-        # Ejecutamos todas las tareas en paralelo y esperamos los resultados
-        distances = await asyncio.gather(*tasks)
+    await consume_concurrently(generate_index_batches(len(cities), batch_size), evaluate, concurrency)
 
-        # Procesamos los resultados de las distancias
-        for i, distance in enumerate(distances):
+    elapsed = time.perf_counter() - started
+    if best_path:
+        logging.info("La mejor ruta es: %s", " -> ".join(best_path))
+        logging.info("Con una distancia total de: %.4f unidades", best_distance)
+        logging.info("Tiempo: %.4f (%d peticiones, %d en vuelo)", elapsed, requests_sent, concurrency)
+    else:
+        logging.error("No se pudo encontrar una ruta válida.")
+
+    append_metrics_row(
+        {
+            "num_cities": len(cities),
+            "paths_processed": total_paths,
+            "best_distance": best_distance if best_path else "",
+            "duration_s": round(elapsed, 4),
+        }
+    )
+    return best_distance, best_path
+
+
+async def find_best_path_ranges(cities, chunks=RANGE_CHUNKS, checkpoint_file=CHECKPOINT_FILE):
+    """
+    Variante por rangos de find_best_path: divide las permutaciones canónicas
+    de las ciudades libres ((n-1)!/2 con CLOSED_TOURS, n!/2 sin él) en
+    `chunks` intervalos de rangos (más si alguno superaría MAX_RANGE_WIDTH)
+    y cada réplica genera y evalúa el suyo, por lo que el tráfico de red es
+    O(chunks) en lugar de O(n!).
+
+    Con checkpoint_file, cada intervalo terminado y la mejor ruta se guardan
+    en ese archivo; al reanudar se omiten los intervalos ya evaluados.
+    """
+    best_path = None
+    best_distance = float('inf')
+    started = time.perf_counter()
+
+    cities_payload = [
+        {"id": city["id"], "x": city["x"], "y": city["y"]} for city in cities
+    ]
+    total_paths = 0
+    free_cities = len(cities) - 1 if CLOSED_TOURS else len(cities)
+    total = canonical_count(free_cities)
+    ranges = split_rank_range(total, max(chunks, math.ceil(total / MAX_RANGE_WIDTH)))
+
+    checkpoint = None
+    if checkpoint_file:
+        # Los rangos son canónicos: un checkpoint de rangos lexicográficos completos no sirve
+        mode = "canonical-range-closed" if CLOSED_TOURS else "canonical-range-open"
+        checkpoint = Checkpoint(checkpoint_file, cities_payload, mode)
+        ranges = [(start, end) for start, end in ranges if not checkpoint.is_done(start, end)]
+        if checkpoint.best_route is not None:
+            best_distance, best_path = checkpoint.best_distance, checkpoint.best_route
+
+    async def search(session, start, end):
+        return start, end, await search_rank_range(session, start, end, cities_payload)
+
+    async with aiohttp.ClientSession() as session:
+        tasks = [search(session, start, end) for start, end in ranges]
+        # Cada intervalo se registra al terminar, sin esperar al resto
+        for finished in asyncio.as_completed(tasks):
+            start, end, (distance, path, evaluated) = await finished
+            total_paths += evaluated
             if distance < best_distance:
                 best_distance = distance
-                best_path = list(itertools.islice(generate_paths(cities), i, i+1))[0]  # Obtener el path correspondiente
+                best_path = path
+            if checkpoint:
+                checkpoint.complete(start, end, distance, path)
 
-            total_paths += 1
+    if checkpoint:
+        checkpoint.save()
 
     elapsed = time.perf_counter() - started
     if best_path:
         logging.info("La mejor ruta es: %s", " -> ".join(best_path))
         logging.info("Con una distancia total de: %.4f unidades", best_distance)
-        logging.info("Tiempo: %.4f", elapsed)
+        logging.info("Tiempo: %.4f (%d intervalos)", elapsed, len(ranges))
     else:
         logging.error("No se pudo encontrar una ruta válida.")
 
@@ -153,6 +472,50 @@ async def find_best_path(cities):
             "duration_s": round(elapsed, 4),
         }
     )
+    return best_distance, best_path
+
+
+def load_cities(num_cities, seed=CITIES_SEED):
+    """
+    Ciudades de la corrida: las del checkpoint si se está reanudando, las de
+    CITIES_FILE si se indicó un archivo, o num_cities aleatorias con la semilla.
+    """
+    if CHECKPOINT_FILE:
+        cities = load_checkpoint_cities(CHECKPOINT_FILE)
+        if cities:
+            return cities
+    if CITIES_FILE:
+        return load_instance(CITIES_FILE)
+    return generate_random_cities(num_cities, seed)
+
+
+def run_search(cities):
+    """
+    Ejecuta el motor de SEARCH_MODE, salvo que la caché ya tenga el resultado
+    de la misma instancia con el mismo modo.
+    """
+    mode = f"{SEARCH_MODE}-{'closed' if CLOSED_TOURS else 'open'}"
+    # El modo "concurrency" mide rendimiento: no tiene sentido saltarlo
+    cacheable = USE_CACHE and SEARCH_MODE != "concurrency"
+    if cacheable:
+        hit = cached_result(cities, mode)
+        if hit:
+            best_distance, best_path = hit
+            logging.info("Resultado en caché (%s): %s", mode, " -> ".join(best_path))
+            logging.info("Con una distancia total de: %.4f unidades", best_distance)
+            return
+
+    result = asyncio.run(SEARCH_ENGINES[SEARCH_MODE](cities))
+    if cacheable and result and result[1]:
+        store_result(cities, mode, *result)
+
+
+SEARCH_ENGINES = {
+    "path": find_best_path,
+    "batch": find_best_path_batched,
+    "range": find_best_path_ranges,
+    "concurrency": measure_concurrency,
+}
 
 # =========================================
 # 6. Ejecutar la Búsqueda de la Mejor Ruta
@@ -161,11 +524,11 @@ if __name__ == "__main__":
     if SECUENCIAL:
         for i in range(2, NUM_CITIES + 1):
             for _ in range(NUMBER_OF_RUNS):
-                cities = generate_random_cities(i)
+                cities = generate_random_cities(i, CITIES_SEED)
                 # Ejecutamos la búsqueda de la mejor ruta de forma secuencial
-                asyncio.run(find_best_path(cities))
+                run_search(cities)
     else:
         for _ in range(NUMBER_OF_RUNS):
-            cities = generate_random_cities(NUM_CITIES)
+            cities = load_cities(NUM_CITIES)
             # Ejecutamos la búsqueda de la mejor ruta de forma asíncrona
-            asyncio.run(find_best_path(cities))
+            run_search(cities)
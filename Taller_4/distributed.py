@@ -0,0 +1,478 @@
+"""
+====================================================
+ Búsqueda TSP distribuida: coordinador y trabajadores
+ Taller Práctico 4 - HPC / Microservicios
+====================================================
+
+El coordinador publica, con multiprocessing.managers sobre TCP, un
+objeto Coordinator que reparte el espacio de rangos canónicos de
+permutation_rank (un solo sentido de cada ruta, n!/2 en vez de n!) en
+tareas [start, end). Cada tarea es el subárbol de las permutaciones con
+la misma primera y última ciudad libre y el mismo tramo inicial, así
+que un trabajador la recorre en profundidad (branch and bound) con la
+mejor distancia global como cota, sin visitar nunca rutas invertidas.
+
+- Los trabajadores envían latidos periódicos; en cada respuesta reciben
+  la mejor distancia global (difusión de la cota) y pueden publicar la
+  suya.
+- Si un trabajador deja de latir por más de WORKER_TIMEOUT_S, sus tareas
+  vuelven a la cola y las toma otro.
+
+Uso:
+    python distributed.py coordinator     # en el nodo coordinador
+    python distributed.py worker          # en cada nodo de cómputo
+    python distributed.py local           # coordinador + NUM_WORKERS procesos locales
+
+Los mensajes del coordinador se deserializan con pickle, así que la
+clave COORDINATOR_AUTHKEY es lo único que impide ejecutar código ajeno:
+los trabajadores no arrancan sin ella y, si el coordinador no la
+recibe, genera una aleatoria y la muestra. El coordinador escucha solo
+en 127.0.0.1 salvo que COORDINATOR_BIND indique otra interfaz.
+"""
+import logging
+import math
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+
+from geometry import city_coordinates, distance_matrix
+from permutation_rank import canonical_count, rank_canonical, unrank_canonical
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+
+COORDINATOR_HOST = os.environ.get("COORDINATOR_HOST", "127.0.0.1")
+COORDINATOR_PORT = int(os.environ.get("COORDINATOR_PORT", "50000"))
+# Interfaz en la que escucha el coordinador ("0.0.0.0" para aceptar otros nodos)
+COORDINATOR_BIND = os.environ.get("COORDINATOR_BIND", "127.0.0.1")
+# Sin valor por defecto: ver coordinator_authkey / worker_authkey
+AUTHKEY = os.environ.get("COORDINATOR_AUTHKEY", "")
+NUM_CITIES = int(os.environ.get("NUM_CITIES", "11"))
+NUM_WORKERS = int(os.environ.get("NUM_WORKERS", "4"))
+# 1: ciclos que vuelven a la primera ciudad; 0: rutas abiertas
+CLOSED_TOURS = os.environ.get("CLOSED_TOURS", "1") == "1"
+# Subárboles mínimos en que se divide la búsqueda (varios por trabajador)
+MIN_TASKS = int(os.environ.get("MIN_TASKS", "256"))
+# Solo en modo "local": segundos tras los que se mata un trabajador (prueba de reasignación)
+KILL_WORKER_AFTER_S = float(os.environ.get("KILL_WORKER_AFTER_S", "0"))
+HEARTBEAT_S = 1.0
+WORKER_TIMEOUT_S = 10.0
+# Nodos del árbol visitados entre consultas al reloj en el trabajador
+TICK_NODES = 4096
+
+
+# =========================================
+# 1. Coordinador
+# =========================================
+class Coordinator:
+    """
+    Estado compartido de la búsqueda: cola de tareas, tareas asignadas por
+    trabajador, latidos y mejor ruta global. Sus métodos se invocan desde
+    los hilos del servidor del manager, por eso todo pasa por un candado.
+    """
+
+    def __init__(self, cities, closed, min_tasks=MIN_TASKS, timeout_s=WORKER_TIMEOUT_S):
+        self.cities = cities
+        self.closed = closed
+        self.free = len(cities) - 1 if closed else len(cities)
+        self.prefix_len = task_prefix_length(self.free, min_tasks)
+        size = math.factorial(self.free - 2 - self.prefix_len) if self.free >= 2 else 1
+        total = canonical_count(self.free)
+        # Tareas pendientes en orden de rango: task_id -> (start, end)
+        self.pending = {
+            task_id: (start, min(start + size, total))
+            for task_id, start in enumerate(range(0, total, size))
+        }
+        self.num_tasks = len(self.pending)
+        self.assigned = {}  # task_id -> (worker_id, start, end)
+        self.completed = set()
+        self.last_seen = {}  # worker_id -> time.monotonic() del último contacto
+        self.timeout_s = timeout_s
+        self.next_worker = 0
+        self.best_distance = math.inf
+        self.best_rank = None
+        self.routes_evaluated = 0
+        self.reassigned = 0
+        self.lock = threading.Lock()
+
+    def problem(self):
+        """Instancia a resolver: (ciudades, closed, largo del prefijo de cada tarea)."""
+        return self.cities, self.closed, self.prefix_len
+
+    def register(self):
+        """Da de alta un trabajador y devuelve su identificador."""
+        with self.lock:
+            worker_id = self.next_worker
+            self.next_worker += 1
+            self.last_seen[worker_id] = time.monotonic()
+            logging.info("Trabajador %d registrado", worker_id)
+            return worker_id
+
+    def request_task(self, worker_id):
+        """
+        Entrega la siguiente tarea pendiente como
+        {"task": (task_id, start, end), "incumbent": <float>}. Si no quedan
+        pendientes pero hay tareas en curso devuelve {"wait": True} (pueden
+        volver a la cola si su trabajador muere); si todo terminó, {"done": True}.
+        """
+        with self.lock:
+            self._touch(worker_id)
+            self._reap()
+            if self.pending:
+                task_id = next(iter(self.pending))
+                start, end = self.pending.pop(task_id)
+                self.assigned[task_id] = (worker_id, start, end)
+                return {"task": (task_id, start, end), "incumbent": self.best_distance}
+            if self.assigned:
+                return {"wait": True, "incumbent": self.best_distance}
+            return {"done": True}
+
+    def heartbeat(self, worker_id, distance=None, rank=None):
+        """Registra un latido (y una posible mejora) y devuelve la mejor distancia global."""
+        with self.lock:
+            self._touch(worker_id)
+            self._offer(distance, rank)
+            return self.best_distance
+
+    def report(self, worker_id, task_id, distance, rank, evaluated):
+        """
+        Marca una tarea como terminada. Un reporte tardío de una tarea ya
+        reasignada se acepta si aún no terminó en otro trabajador.
+        """
+        with self.lock:
+            self._touch(worker_id)
+            self._offer(distance, rank)
+            if task_id in self.completed:
+                return self.best_distance
+            self.assigned.pop(task_id, None)
+            self.pending.pop(task_id, None)
+            self.completed.add(task_id)
+            self.routes_evaluated += evaluated
+            return self.best_distance
+
+    def status(self):
+        with self.lock:
+            return {
+                "completed": len(self.completed),
+                "tasks": self.num_tasks,
+                "workers": len(self.last_seen),
+                "best_distance": self.best_distance,
+                "reassigned": self.reassigned,
+            }
+
+    def done(self):
+        with self.lock:
+            return len(self.completed) == self.num_tasks
+
+    def result(self):
+        """(mejor distancia, mejor ruta como índices, rutas evaluadas, tareas reasignadas)."""
+        with self.lock:
+            route = rank_to_route(self.best_rank, len(self.cities), self.closed)
+            return self.best_distance, route, self.routes_evaluated, self.reassigned
+
+    def _touch(self, worker_id):
+        if worker_id not in self.last_seen:
+            logging.info("Trabajador %d reapareció", worker_id)
+        self.last_seen[worker_id] = time.monotonic()
+
+    def _offer(self, distance, rank):
+        if distance is not None and distance < self.best_distance:
+            self.best_distance = distance
+            self.best_rank = rank
+
+    def _reap(self):
+        """Devuelve a la cola las tareas de los trabajadores sin latidos recientes."""
+        now = time.monotonic()
+        dead = {w for w, seen in self.last_seen.items() if now - seen > self.timeout_s}
+        if not dead:
+            return
+        for task_id, (worker_id, start, end) in list(self.assigned.items()):
+            if worker_id in dead:
+                del self.assigned[task_id]
+                self.pending[task_id] = (start, end)
+                self.reassigned += 1
+        for worker_id in dead:
+            del self.last_seen[worker_id]
+            logging.warning("Trabajador %d sin latidos: sus tareas vuelven a la cola", worker_id)
+
+
+def task_prefix_length(free, min_tasks):
+    """
+    Largo L del tramo intermedio que fija cada tarea: el más corto con el que
+    los subárboles (pares (primera, última) x permutaciones de L ciudades
+    intermedias) alcanzan min_tasks. Cada uno cubre (free-2-L)! rangos
+    canónicos consecutivos.
+    """
+    if free < 2:
+        return 0
+    middle = free - 2
+    pairs = math.comb(free, 2)
+    length = 0
+    while length < middle and pairs * math.perm(middle, length) < min_tasks:
+        length += 1
+    return length
+
+
+def rank_to_route(rank, num_cities, closed):
+    """Ruta (índices de ciudades) correspondiente a un rango canónico."""
+    if rank is None:
+        return None
+    if not closed:
+        return unrank_canonical(rank, num_cities)
+    return [0] + [c + 1 for c in unrank_canonical(rank, num_cities - 1)] + [0]
+
+
+# =========================================
+# 2. Trabajador: branch and bound sobre un subárbol
+# =========================================
+def search_subtree(rows, start_rank, prefix_len, closed, bound, refresh):
+    """
+    Recorre en profundidad las rutas del subárbol de la permutación canónica
+    start_rank: misma primera y última ciudad libre y mismas prefix_len
+    ciudades intermedias iniciales. La última ciudad se fija desde el
+    principio, así que solo se generan rutas en sentido canónico. Cada rama
+    se abandona en cuanto su costo parcial alcanza la cota.
+
+    Parameters
+    ----------
+    rows : list[list[float]]
+        Matriz de distancias como listas (indexación escalar rápida).
+    start_rank : int
+        Primer rango del subárbol.
+    prefix_len : int
+        Ciudades intermedias fijadas por la tarea (ver task_prefix_length).
+    closed : bool
+        Si es True, la ruta sale de la ciudad 0 y vuelve a ella.
+    bound : float
+        Mejor distancia global conocida al empezar.
+    refresh : callable
+        refresh(distancia, rango) -> cota global; se invoca cada
+        HEARTBEAT_S segundos con la mejor ruta local (o None, None).
+
+    Returns
+    -------
+    tuple[float or None, int or None, int]
+        (mejor distancia local, su rango, rutas completas evaluadas).
+    """
+    n = len(rows)
+    offset = 1 if closed else 0
+    free = n - offset
+    perm = [c + offset for c in unrank_canonical(start_rank, free)]
+    if free >= 2:
+        # Primera ciudad libre + tramo fijado; la última se agrega en cada hoja
+        last = perm[-1]
+        route = ([0] if closed else []) + perm[:1 + prefix_len]
+        left = free - 2 - prefix_len
+    else:
+        last = None
+        route = ([0] if closed else []) + perm
+        left = 0
+    visited = [False] * n
+    for c in route:
+        visited[c] = True
+    if last is not None:
+        visited[last] = True
+    cost = sum(rows[a][b] for a, b in zip(route, route[1:]))
+
+    best_distance, best_route = None, None
+    evaluated = 0
+    nodes = 0
+    next_beat = time.monotonic() + HEARTBEAT_S
+
+    def explore(current, cost, left):
+        nonlocal bound, best_distance, best_route, evaluated, nodes, next_beat
+        if cost >= bound:
+            return
+        nodes += 1
+        if nodes % TICK_NODES == 0 and time.monotonic() >= next_beat:
+            best_rank = route_rank(best_route, offset) if best_route else None
+            bound = min(bound, refresh(best_distance, best_rank))
+            next_beat = time.monotonic() + HEARTBEAT_S
+            if cost >= bound:
+                return
+        if left == 0:
+            evaluated += 1
+            total, end = cost, current
+            if last is not None:
+                total += rows[current][last]
+                end = last
+            if closed:
+                total += rows[end][0]
+            if total < bound:
+                bound = best_distance = total
+                best_route = route + ([last] if last is not None else [])
+            return
+
+        row = rows[current]
+        for c in range(offset, n):
+            if visited[c]:
+                continue
+            visited[c] = True
+            route.append(c)
+            explore(c, cost + row[c], left - 1)
+            route.pop()
+            visited[c] = False
+
+    if route:
+        explore(route[-1], cost, left)
+    best_rank = route_rank(best_route, offset) if best_route else None
+    return best_distance, best_rank, evaluated
+
+
+def route_rank(route, offset):
+    """Rango canónico de la parte libre de una ruta (sin el origen fijo)."""
+    return rank_canonical([c - offset for c in route[offset:]])
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+_coordinator = None
+
+
+def _get_coordinator():
+    return _coordinator
+
+
+CoordinatorManager.register("coordinator", callable=_get_coordinator)
+
+
+def coordinator_authkey():
+    """
+    Clave del coordinador: COORDINATOR_AUTHKEY o, si no está definida, una
+    aleatoria que se muestra para configurarla en los trabajadores.
+    """
+    if AUTHKEY:
+        return AUTHKEY.encode()
+    key = secrets.token_hex(16)
+    logging.warning("COORDINATOR_AUTHKEY no definida; clave generada para los trabajadores: %s", key)
+    return key.encode()
+
+
+def worker_authkey():
+    """Clave de un trabajador: COORDINATOR_AUTHKEY es obligatoria."""
+    if not AUTHKEY:
+        raise SystemExit("Defina COORDINATOR_AUTHKEY con la clave del coordinador")
+    return AUTHKEY.encode()
+
+
+def run_worker(host=COORDINATOR_HOST, port=COORDINATOR_PORT, authkey=None):
+    """
+    Se conecta al coordinador y procesa tareas hasta que no quede ninguna.
+    Termina sin error si el coordinador desaparece. authkey=None usa
+    worker_authkey().
+    """
+    if authkey is None:
+        authkey = worker_authkey()
+    manager = CoordinatorManager(address=(host, port), authkey=authkey)
+    manager.connect()
+    coordinator = manager.coordinator()
+    worker_id = coordinator.register()
+    cities, closed, prefix_len = coordinator.problem()
+    rows = distance_matrix(city_coordinates(cities)).tolist()
+
+    def refresh(distance, rank):
+        return coordinator.heartbeat(worker_id, distance, rank)
+
+    try:
+        while True:
+            reply = coordinator.request_task(worker_id)
+            if reply.get("done"):
+                break
+            if reply.get("wait"):
+                time.sleep(HEARTBEAT_S)
+                continue
+            task_id, start, _ = reply["task"]
+            distance, rank, evaluated = search_subtree(
+                rows, start, prefix_len, closed, reply["incumbent"], refresh
+            )
+            coordinator.report(worker_id, task_id, distance, rank, evaluated)
+    except (ConnectionError, EOFError):
+        logging.warning("Trabajador %d: el coordinador ya no responde", worker_id)
+
+
+# =========================================
+# 3. Puesta en marcha
+# =========================================
+def start_coordinator(cities, closed, authkey, host="127.0.0.1", port=COORDINATOR_PORT):
+    """Crea el Coordinator y lo sirve por TCP en un hilo de fondo."""
+    global _coordinator
+    _coordinator = Coordinator(cities, closed)
+    manager = CoordinatorManager(address=(host, port), authkey=authkey)
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(
+        "Coordinador en %s:%d: %d tareas (prefijos de largo %d)",
+        host, port, _coordinator.num_tasks, _coordinator.prefix_len,
+    )
+    return _coordinator
+
+
+def wait_for_search(coordinator, workers=()):
+    """Espera a que terminen todas las tareas, informando el progreso cada HEARTBEAT_S."""
+    started = time.perf_counter()
+    killed = not (workers and KILL_WORKER_AFTER_S > 0)
+    while not coordinator.done():
+        time.sleep(HEARTBEAT_S)
+        status = coordinator.status()
+        logging.info(
+            "Tareas %d/%d | trabajadores %d | mejor %.4f | reasignadas %d",
+            status["completed"], status["tasks"], status["workers"],
+            status["best_distance"], status["reassigned"],
+        )
+        if not killed and time.perf_counter() - started >= KILL_WORKER_AFTER_S:
+            logging.warning("Terminando el trabajador con PID %d (prueba de reasignación)", workers[0].pid)
+            workers[0].terminate()
+            killed = True
+    return time.perf_counter() - started
+
+
+def report_result(coordinator, cities, elapsed):
+    distance, route, evaluated, reassigned = coordinator.result()
+    total = canonical_count(coordinator.free)
+    print("\n=== Búsqueda distribuida ===")
+    print(f"Mejor ruta: {[cities[i]['id'] for i in route]}")
+    print(f"Distancia: {distance:.4f}")
+    print(f"Rutas evaluadas: {evaluated} de {total} ({100 * (1 - evaluated / total):.2f}% podadas)")
+    print(f"Tareas reasignadas: {reassigned}")
+    print(f"Tiempo: {elapsed:.4f} segundos")
+
+
+def main(role):
+    if role == "worker":
+        run_worker()
+        return
+
+    # Importado aquí: los trabajadores no necesitan aiohttp
+    from bruteForce import load_cities
+
+    cities = load_cities(NUM_CITIES)
+    if role == "coordinator":
+        coordinator = start_coordinator(cities, CLOSED_TOURS, coordinator_authkey(), host=COORDINATOR_BIND)
+        report_result(coordinator, cities, wait_for_search(coordinator))
+    elif role == "local":
+        # Clave propia de esta ejecución, compartida con los procesos hijos
+        authkey = AUTHKEY.encode() or secrets.token_bytes(32)
+        coordinator = start_coordinator(cities, CLOSED_TOURS, authkey, host=COORDINATOR_HOST)
+        workers = [
+            Process(target=run_worker, kwargs={"authkey": authkey}) for _ in range(NUM_WORKERS)
+        ]
+        for worker in workers:
+            worker.start()
+        elapsed = wait_for_search(coordinator, workers)
+        for worker in workers:
+            worker.join()
+        report_result(coordinator, cities, elapsed)
+    else:
+        raise SystemExit(f"Rol desconocido: {role} (coordinator, worker o local)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "local")
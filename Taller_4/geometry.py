@@ -0,0 +1,45 @@
+"""
+====================================================
+ Coordenadas y distancias euclidianas entre ciudades
+ Taller Práctico 4 - HPC / Microservicios
+====================================================
+
+Funciones numéricas compartidas por la API (app.py) y por los
+trabajadores de distributed.py, que así no necesitan Flask.
+"""
+import numpy as np
+
+
+def city_coordinates(cities):
+    """
+    Construye la tabla de coordenadas (n x 2) de las ciudades validadas.
+
+    Parameters
+    ----------
+    cities : list[dict]
+        Ciudades ya validadas con `validate_cities`.
+
+    Returns
+    -------
+    numpy.ndarray
+        Arreglo float64 con una fila (x, y) por ciudad.
+    """
+    return np.array([(city["x"], city["y"]) for city in cities], dtype=np.float64)
+
+
+def distance_matrix(coords):
+    """
+    Calcula la matriz (n x n) de distancias euclidianas entre ciudades.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        Tabla (n x 2) de coordenadas.
+
+    Returns
+    -------
+    numpy.ndarray
+        Matriz float64 con dist[i, j] = distancia entre las ciudades i y j.
+    """
+    steps = coords[:, None, :] - coords[None, :, :]
+    return np.hypot(steps[..., 0], steps[..., 1])
@@ -0,0 +1,172 @@
+"""
+====================================================
+ Rank / unrank de permutaciones (código de Lehmer)
+ Taller Práctico 4 - HPC / Microservicios
+====================================================
+
+Numera las permutaciones de 0..n-1 en orden lexicográfico
+(el mismo orden que produce itertools.permutations sobre una
+secuencia ordenada), de modo que un intervalo [start, end) de
+rangos describe un bloque de rutas sin tener que enviarlas.
+
+Las funciones *canonical* numeran solo un sentido de cada ruta
+(primer elemento menor que el último): n!/2 rangos en vez de n!.
+"""
+import itertools
+import math
+
+import numpy as np
+
+
+def permutation_count(n):
+    """
+    Número total de permutaciones de n elementos (n!).
+    """
+    return math.factorial(n)
+
+
+def rank_permutation(perm):
+    """
+    Calcula el rango lexicográfico de una permutación de 0..n-1.
+
+    Parameters
+    ----------
+    perm : sequence[int]
+        Permutación de los enteros 0..n-1.
+
+    Returns
+    -------
+    int
+        Posición de perm en el orden lexicográfico (empezando en 0).
+    """
+    n = len(perm)
+    rank = 0
+    remaining = list(range(n))
+    for i, value in enumerate(perm):
+        digit = remaining.index(value)
+        rank += digit * math.factorial(n - 1 - i)
+        remaining.pop(digit)
+    return rank
+
+
+def unrank_permutation(rank, n):
+    """
+    Reconstruye la permutación de 0..n-1 con el rango lexicográfico dado.
+
+    Parameters
+    ----------
+    rank : int
+        Rango en [0, n!).
+    n : int
+        Número de elementos.
+
+    Returns
+    -------
+    list[int]
+        Permutación correspondiente al rango.
+    """
+    if not 0 <= rank < math.factorial(n):
+        raise ValueError(f"rank must be in [0, {n}!)")
+
+    remaining = list(range(n))
+    perm = []
+    for i in range(n):
+        digit, rank = divmod(rank, math.factorial(n - 1 - i))
+        perm.append(remaining.pop(digit))
+    return perm
+
+
+def unrank_permutations(ranks, n):
+    """
+    Versión vectorizada de unrank_permutation para muchos rangos a la vez.
+
+    Parameters
+    ----------
+    ranks : numpy.ndarray
+        Arreglo entero (k,) de rangos en [0, n!). n debe ser <= 20
+        para que los rangos quepan en int64.
+    n : int
+        Número de elementos.
+
+    Returns
+    -------
+    numpy.ndarray
+        Arreglo int64 (k x n) con una permutación por fila.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    k = ranks.shape[0]
+    perms = np.empty((k, n), dtype=np.int64)
+    # available[r, v] indica si el valor v aún no se usó en la fila r
+    available = np.ones((k, n), dtype=bool)
+    rows = np.arange(k)
+
+    for i in range(n):
+        base = math.factorial(n - 1 - i)
+        digit = (ranks // base) % (n - i)
+        # El valor elegido es el (digit)-ésimo disponible de cada fila
+        position = np.cumsum(available, axis=1) - 1
+        chosen = np.argmax(available & (position == digit[:, None]), axis=1)
+        perms[:, i] = chosen
+        available[rows, chosen] = False
+
+    return perms
+
+
+# =========================================
+# Permutaciones canónicas (un sentido de cada ruta)
+# =========================================
+# Una ruta y su reverso miden lo mismo: solo se numeran las permutaciones
+# cuyo primer elemento es menor que el último. El rango canónico es
+# índice_del_par * (n-2)! + rango lexicográfico del tramo intermedio, donde
+# los pares (primero, último) siguen el orden de itertools.combinations.
+# Así un intervalo de rangos canónicos describe solo rutas distintas y no
+# hay que generar y descartar la mitad invertida. El enumerador que recorre
+# este mismo orden es tsp_comun.enumeracion.permutaciones_canonicas.
+
+def canonical_count(n):
+    """Número de permutaciones canónicas de n elementos: n!/2 (1 si n < 2)."""
+    return math.factorial(n) // 2 if n >= 2 else 1
+
+
+def rank_canonical(perm):
+    """Rango canónico de una permutación canónica de 0..n-1 (inversa de unrank_canonical)."""
+    n = len(perm)
+    if n < 2:
+        return 0
+    first, last = perm[0], perm[-1]
+    # Posición del par (first, last) en itertools.combinations(range(n), 2)
+    pair = first * (2 * n - first - 1) // 2 + (last - first - 1)
+    middle = [v for v in range(n) if v != first and v != last]
+    position = {v: i for i, v in enumerate(middle)}
+    return pair * math.factorial(n - 2) + rank_permutation([position[v] for v in perm[1:-1]])
+
+
+def unrank_canonical(rank, n):
+    """Permutación canónica de 0..n-1 con el rango canónico dado."""
+    if not 0 <= rank < canonical_count(n):
+        raise ValueError(f"rank must be in [0, {n}!/2)")
+    if n < 2:
+        return list(range(n))
+    pair, middle_rank = divmod(rank, math.factorial(n - 2))
+    first, last = next(itertools.islice(itertools.combinations(range(n), 2), pair, None))
+    middle = [v for v in range(n) if v != first and v != last]
+    return [first, *(middle[i] for i in unrank_permutation(middle_rank, n - 2)), last]
+
+
+def unrank_canonical_batch(ranks, n):
+    """
+    Versión vectorizada de unrank_canonical: arreglo int64 (k x n) con una
+    permutación canónica por fila. n debe ser <= 20.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    if n < 2:
+        return np.tile(np.arange(n, dtype=np.int64), (ranks.shape[0], 1))
+    pairs = np.array(list(itertools.combinations(range(n), 2)), dtype=np.int64)
+    pair, middle_rank = np.divmod(ranks, math.factorial(n - 2))
+    first, last = pairs[pair, 0][:, None], pairs[pair, 1][:, None]
+    # El tramo intermedio es una permutación de 0..n-3; cada valor se corre
+    # para saltar los dos elementos ya usados en los extremos (first < last)
+    middle = unrank_permutations(middle_rank, n - 2)
+    middle += middle >= first
+    middle += middle >= last
+    return np.hstack([first, middle, last])
@@ -0,0 +1,11 @@
+"""
+Código compartido por los scripts del problema del viajero (Taller_1,
+Taller_4 y Ejercicios_clase). Se instala una vez desde la raíz del
+repositorio con `pip install -e .`, así cada taller lo importa sin
+depender de la ubicación de los demás.
+
+- enumeracion: enumerador canónico de rutas (un sentido de cada una).
+- recorrido_dfs: recorrido en profundidad con costo incremental.
+- checkpoint: progreso persistente de búsquedas por rangos.
+- instances: lectura de instancias TSPLIB/CSV y caché en disco.
+"""
@@ -0,0 +1,130 @@
+"""
+====================================================
+ Checkpoint de búsquedas TSP por rangos
+ TrabajosHPC - código compartido (tsp_comun)
+====================================================
+
+Guarda en un archivo JSON pequeño el progreso de una búsqueda por
+rangos lexicográficos: los intervalos [start, end) ya evaluados
+(fusionados, así el archivo crece con el número de huecos y no con el
+de intervalos), la mejor ruta y su distancia, y las ciudades de la
+instancia para poder reanudarla con los mismos datos.
+
+El archivo se reescribe de forma atómica (archivo temporal + rename) y
+como mucho una vez cada `interval_s` segundos, para que el costo sea
+despreciable frente a la búsqueda.
+"""
+import bisect
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+
+CHECKPOINT_INTERVAL_S = 5.0
+
+
+def instance_key(cities, mode):
+    """Huella de la instancia: coordenadas de las ciudades + modo de búsqueda."""
+    payload = json.dumps([mode, [(c["id"], c["x"], c["y"]) for c in cities]])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_checkpoint_cities(path):
+    """
+    Ciudades guardadas en un checkpoint, o None si el archivo no existe.
+    Permite reanudar exactamente la misma instancia aleatoria.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open() as f:
+        return json.load(f)["cities"]
+
+
+class Checkpoint:
+    """
+    Progreso persistente de una búsqueda por rangos.
+
+    Parameters
+    ----------
+    path : str or Path
+        Archivo del checkpoint.
+    cities : list[dict]
+        Ciudades de la instancia.
+    mode : str
+        Modo de búsqueda (p. ej. "range-closed"); un checkpoint de otra
+        instancia o de otro modo se ignora.
+    interval_s : float
+        Segundos mínimos entre escrituras.
+    """
+
+    def __init__(self, path, cities, mode, interval_s=CHECKPOINT_INTERVAL_S):
+        self.path = Path(path)
+        self.cities = cities
+        self.key = instance_key(cities, mode)
+        self.interval_s = interval_s
+        self.starts = []  # inicios de los intervalos hechos, ordenados y disjuntos
+        self.ends = []
+        self.best_distance = math.inf
+        self.best_route = None
+        self.last_save = time.monotonic()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with self.path.open() as f:
+            data = json.load(f)
+        if data.get("key") != self.key:
+            logging.warning("Checkpoint %s es de otra instancia: se ignora", self.path)
+            return
+        for start, end in data["done"]:
+            self.starts.append(start)
+            self.ends.append(end)
+        if data["best_distance"] is not None:
+            self.best_distance = data["best_distance"]
+            self.best_route = data["best_route"]
+        logging.info(
+            "Reanudando desde %s: %d intervalos hechos, mejor distancia %.4f",
+            self.path, len(self.starts), self.best_distance,
+        )
+
+    def is_done(self, start, end):
+        """True si [start, end) está completamente cubierto por intervalos ya evaluados."""
+        i = bisect.bisect_right(self.starts, start) - 1
+        return i >= 0 and self.ends[i] >= end
+
+    def complete(self, start, end, distance=None, route=None):
+        """Marca [start, end) como evaluado, actualiza la mejor ruta y guarda si toca."""
+        # Fusiona con los intervalos que se solapan o tocan a [start, end)
+        lo = bisect.bisect_left(self.ends, start)
+        hi = bisect.bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+        if distance is not None and distance < self.best_distance:
+            self.best_distance = distance
+            self.best_route = route
+        if time.monotonic() - self.last_save >= self.interval_s:
+            self.save()
+
+    def save(self):
+        """Escribe el checkpoint de forma atómica."""
+        data = {
+            "key": self.key,
+            "cities": self.cities,
+            "done": list(zip(self.starts, self.ends)),
+            "best_distance": None if self.best_route is None else self.best_distance,
+            "best_route": self.best_route,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.last_save = time.monotonic()
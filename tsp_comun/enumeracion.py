@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+
+# ==========================
+# ENUMERACIÓN CANÓNICA DE RUTAS
+# ==========================
+# Un solo sentido de cada ruta (primer elemento menor que el último), para
+# todos los motores exactos: Taller_1, Ejercicios_clase y bruteForce.py de
+# Taller_4. Sin prefijo, el orden es el de los rangos canónicos de
+# Taller_4/permutation_rank.py: pares (primero, último) en el orden de
+# itertools.combinations y, dentro de cada par, el tramo intermedio en
+# orden lexicográfico.
+
+# Rutas por bloque: la memoria pico es O(TAM_BLOQUE x procesos), no O((n-1)!)
+TAM_BLOQUE = 10_000
+
+
+def permutaciones_canonicas(elementos, prefijo=()):
+    """
+    Genera las permutaciones de `elementos` que empiezan por `prefijo` y cuyo
+    primer elemento es menor que el último. Una ruta y su reverso miden lo
+    mismo, así que esto produce exactamente uno de cada par.
+    """
+    elementos = list(elementos)
+    if len(elementos) < 2:
+        yield tuple(elementos)
+        return
+
+    prefijo = tuple(prefijo)
+    restantes = [e for e in elementos if e not in prefijo]
+    if not prefijo:
+        for primero, ultimo in itertools.combinations(elementos, 2):
+            medio = [e for e in restantes if e != primero and e != ultimo]
+            for perm in itertools.permutations(medio):
+                yield (primero, *perm, ultimo)
+    elif not restantes:
+        if prefijo[0] < prefijo[-1]:
+            yield prefijo
+    else:
+        for ultimo in restantes:
+            if ultimo < prefijo[0]:
+                continue
+            medio = [e for e in restantes if e != ultimo]
+            for perm in itertools.permutations(medio):
+                yield (*prefijo, *perm, ultimo)
+
+
+def generar_rutas_por_bloques(n_ciudades, tam_bloque=TAM_BLOQUE, cerrado=True):
+    """
+    Genera, sin materializarlas todas, las rutas en bloques NumPy con
+    k <= tam_bloque filas, enumerando solo un sentido de cada recorrido.
+
+    Con cerrado=True son ciclos que empiezan y terminan en la ciudad 0
+    ((n-1)!/2 rutas de n+1 columnas); con cerrado=False son caminos abiertos
+    que pueden empezar en cualquier ciudad (n!/2 rutas de n columnas).
+    """
+    if n_ciudades < 2:
+        yield np.zeros((1, 2 if cerrado else 1), dtype=np.int64)
+        return
+
+    libres = range(1, n_ciudades) if cerrado else range(n_ciudades)
+    permutaciones = permutaciones_canonicas(libres)
+    while True:
+        # fromiter sobre los enteros aplanados evita crear una lista de tuplas por bloque
+        medio = np.fromiter(
+            itertools.chain.from_iterable(itertools.islice(permutaciones, tam_bloque)), dtype=np.int64
+        )
+        if len(medio) == 0:
+            return
+        medio = medio.reshape(-1, len(libres))
+        if not cerrado:
+            yield medio
+            continue
+        bloque = np.zeros((len(medio), n_ciudades + 1), dtype=np.int64)
+        bloque[:, 1:-1] = medio
+        yield bloque
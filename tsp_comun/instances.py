@@ -0,0 +1,140 @@
+"""
+====================================================
+ Instancias TSP: archivos, semillas y caché de resultados
+ TrabajosHPC - código compartido (tsp_comun)
+====================================================
+
+- load_instance lee ciudades desde un archivo TSPLIB (.tsp, sección
+  NODE_COORD_SECTION) o CSV (columnas x,y o id,x,y, con o sin cabecera).
+- La caché guarda en disco, en un JSON por instancia, la mejor ruta y
+  su distancia, con la misma huella (coordenadas + modo) que usan los
+  checkpoints: repetir una corrida sobre la misma instancia y el mismo
+  modo devuelve el resultado sin volver a buscar. Las matrices de
+  distancias se guardan igual, en un .npy por instancia.
+
+Lo usan bruteForce.py (Taller_4) y los scripts de Taller_1 y
+Ejercicios_clase; las ciudades son dicts {"id", "x", "y"}.
+
+Las distancias son euclidianas sin redondear, no las enteras (nint) que
+usa TSPLIB para EUC_2D.
+"""
+import csv
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .checkpoint import instance_key
+
+CACHE_DIR = Path(os.environ.get("TSP_CACHE_DIR", ".tsp_cache"))
+
+
+# =========================================
+# 1. Lectura de instancias
+# =========================================
+def read_tsplib(path):
+    """
+    Lee las coordenadas de un archivo TSPLIB. Solo se admiten instancias
+    con NODE_COORD_SECTION (EUC_2D, CEIL_2D, ATT, ...).
+
+    Returns
+    -------
+    list[dict]
+        Ciudades {"id", "x", "y"}; el id es el número de nodo del archivo.
+    """
+    cities = []
+    in_coords = False
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("NODE_COORD_SECTION"):
+                in_coords = True
+                continue
+            if not in_coords:
+                key, _, value = line.partition(":")
+                if key.strip() == "EDGE_WEIGHT_TYPE" and value.strip() == "EXPLICIT":
+                    raise ValueError(f"{path}: EXPLICIT weights are not supported, only coordinates")
+                continue
+            if line == "EOF" or not line[0].isdigit():
+                break
+            node, x, y = line.split()[:3]
+            cities.append({"id": node, "x": float(x), "y": float(y)})
+    if not cities:
+        raise ValueError(f"{path}: no NODE_COORD_SECTION found")
+    return cities
+
+
+def read_csv(path):
+    """
+    Lee ciudades de un CSV con columnas x,y o id,x,y. La primera fila se
+    trata como cabecera si no es numérica; sin columna id se usan C1, C2, ...
+    """
+    cities = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            try:
+                values = [float(v) for v in row[-2:]]
+            except ValueError:
+                continue  # cabecera
+            city_id = row[0] if len(row) >= 3 else f"C{len(cities) + 1}"
+            cities.append({"id": city_id, "x": values[0], "y": values[1]})
+    return cities
+
+
+def load_instance(path):
+    """Carga una instancia TSPLIB (.tsp) o CSV según la extensión del archivo."""
+    if str(path).lower().endswith(".tsp"):
+        return read_tsplib(path)
+    return read_csv(path)
+
+
+def cities_from_points(points):
+    """Ciudades {"id", "x", "y"} (ids C1, C2, ...) a partir de tuplas (x, y)."""
+    return [{"id": f"C{i + 1}", "x": float(x), "y": float(y)} for i, (x, y) in enumerate(points)]
+
+
+def points_from_cities(cities):
+    """Inversa de cities_from_points: lista de tuplas (x, y)."""
+    return [(city["x"], city["y"]) for city in cities]
+
+
+# =========================================
+# 2. Caché de resultados en disco
+# =========================================
+def cached_matrix(cities, compute):
+    """
+    Matriz de distancias de la instancia: se lee de la caché si ya se
+    calculó antes y, si no, se calcula con `compute(cities)` y se guarda.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{instance_key(cities, 'matrix')}.npy"
+    if path.exists():
+        return np.load(path)
+    matrix = np.asarray(compute(cities), dtype=np.float64)
+    np.save(path, matrix)
+    return matrix
+
+
+def cached_result(cities, mode):
+    """(mejor distancia, mejor ruta) guardados para la instancia y el modo, o None."""
+    path = CACHE_DIR / f"{instance_key(cities, mode)}.json"
+    if not path.exists():
+        return None
+    with path.open() as f:
+        data = json.load(f)
+    return data["best_distance"], data["best_path"]
+
+
+def store_result(cities, mode, best_distance, best_path):
+    """Guarda el resultado de una búsqueda exacta en la caché (escritura atómica)."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{instance_key(cities, mode)}.json"
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w") as f:
+        json.dump({"mode": mode, "best_distance": best_distance, "best_path": best_path}, f)
+    os.replace(tmp, path)
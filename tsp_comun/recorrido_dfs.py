@@ -0,0 +1,65 @@
+import itertools
+import math
+
+# ==========================
+# RECORRIDO EN PROFUNDIDAD
+# ==========================
+# Compartido por Taller_1/salesman_secuencialParalel.py y Ejercicios_clase/grises_secuencial.py.
+# La matriz se indexa con matriz[i][j]: con listas de listas es más rápido
+# que con un ndarray (indexación escalar), pero ambos sirven.
+
+def generar_prefijos(n_ciudades, n_tareas_min):
+    """
+    Devuelve los prefijos (ciudades tras la 0) más cortos cuyo número alcance
+    n_tareas_min; cada prefijo define un subárbol de rutas independiente.
+    """
+    otras = range(1, n_ciudades)
+    largo = 0
+    while largo < n_ciudades - 1 and math.perm(n_ciudades - 1, largo) < n_tareas_min:
+        largo += 1
+    return list(itertools.permutations(otras, largo))
+
+
+def recorrer_dfs(matriz, prefijo=(), menor_distancia=float('inf')):
+    """
+    Recorre en profundidad las rutas cerradas que empiezan por [0, *prefijo],
+    arrastrando el costo parcial: cada hoja cuesta O(1) en lugar de O(n), y una
+    rama se abandona en cuanto su costo parcial alcanza la mejor distancia
+    conocida. Solo se aceptan rutas en sentido canónico (última ciudad libre
+    mayor que la primera). Devuelve (mejor_ruta, menor_distancia, hojas).
+    """
+    n = len(matriz)
+    ruta = [0, *prefijo]
+    visitada = [False] * n
+    for c in ruta:
+        visitada[c] = True
+    mejor_ruta = None
+    hojas = 0
+
+    def explorar(actual, costo, faltan):
+        nonlocal mejor_ruta, menor_distancia, hojas
+        if costo >= menor_distancia:
+            return
+        if faltan == 0:
+            if len(ruta) > 2 and ruta[-1] < ruta[1]:
+                return  # reverso de una ruta canónica
+            hojas += 1
+            total = costo + matriz[actual][0]
+            if total < menor_distancia:
+                menor_distancia = total
+                mejor_ruta = ruta + [0]
+            return
+
+        fila = matriz[actual]
+        for j in range(1, n):
+            if visitada[j]:
+                continue
+            visitada[j] = True
+            ruta.append(j)
+            explorar(j, costo + fila[j], faltan - 1)
+            ruta.pop()
+            visitada[j] = False
+
+    costo_prefijo = sum(matriz[ruta[i]][ruta[i + 1]] for i in range(len(ruta) - 1))
+    explorar(ruta[-1], costo_prefijo, n - len(ruta))
+    return mejor_ruta, menor_distancia, hojas